@@ -1,17 +1,23 @@
 from fastapi import HTTPException
-from api.db_setup import dynamodb
+from api.aws_wrappers.dynamo import get_table
 from boto3.dynamodb.conditions import Key
 import logging
 
 logger = logging.getLogger(__name__)
-users_table = dynamodb.Table('users')
+users_table = get_table('users')
 
-async def require_email_verification(username: str):
+async def require_email_verification(user: dict):
     """
     Check if user's email is verified. Raise HTTPException if not.
+    `user` is the authenticated user, possibly cached; its email_verified is
+    trusted when true, otherwise the users table is checked in case the
+    email was verified since it was cached.
     """
+    if user.get('email_verified'):
+        return True
+    username = user.get('username')
     try:
-        response = users_table.get_item(Key={'username': username})
+        response = await users_table.get_item(Key={'username': username})
         
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="User not found")
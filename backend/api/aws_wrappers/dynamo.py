@@ -0,0 +1,337 @@
+import asyncio
+import base64
+import copy
+import functools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from fastapi import HTTPException, Response
+from api.db_setup import dynamodb, DYNAMO_MAX_WORKERS
+
+# Dedicated pool for blocking boto3 calls. It is sized to match the
+# connection pool of the shared DynamoDB resource (see db_setup), so every
+# worker thread can hold a connection without waiting on another one.
+_executor = ThreadPoolExecutor(
+    max_workers=DYNAMO_MAX_WORKERS,
+    thread_name_prefix="dynamodb"
+)
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking boto3 call on the DynamoDB executor and await the result,
+    so the event loop keeps serving other requests and websockets meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+class RequestCache:
+    """
+    Identity map of the items read and written during one request, so
+    reading the same item again costs no DynamoDB call. Items are keyed by
+    (table name, primary key); None records an item known not to exist.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.reads = 0
+        self.saved = 0
+
+    def invalidate_table(self, table_name: str):
+        for cache_key in [cache_key for cache_key in self.items if cache_key[0] == table_name]:
+            del self.items[cache_key]
+
+_request_cache: ContextVar[Optional[RequestCache]] = ContextVar("dynamo_request_cache", default=None)
+
+@contextmanager
+def request_cache():
+    """
+    Cache full-item reads by primary key for the duration of the block
+    (one request; see the middleware in api.main). Yields the RequestCache,
+    whose `saved` counts the reads served from it.
+    """
+    cache = RequestCache()
+    token = _request_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _request_cache.reset(token)
+
+def _cache_key(table_name: str, key: dict) -> tuple:
+    return (table_name, tuple(sorted(key.items())))
+
+class AsyncTable:
+    """
+    Awaitable wrapper around a boto3 DynamoDB Table.
+    Methods take the same keyword arguments as their boto3 counterparts.
+
+    Inside request_cache(), get_item calls for a whole item (no projection,
+    not ConsistentRead) are served from the request's identity map when
+    the item was already read or written in the same request. Writes keep
+    the map up to date: put_item and updates returning ALL_NEW store the new
+    item, other writes and failed conditions drop it.
+    """
+
+    def __init__(self, table):
+        self._table = table
+        self.name = table.name
+        # Primary key attribute names, learned from the first Key seen
+        self._key_names = None
+
+    def _key_of(self, item: dict) -> Optional[dict]:
+        if self._key_names is None or not all(name in item for name in self._key_names):
+            return None
+        return {name: item[name] for name in self._key_names}
+
+    def _remember(self, cache: Optional[RequestCache], key: Optional[dict], item: Optional[dict]):
+        if cache is not None and key is not None:
+            cache.items[_cache_key(self.name, key)] = copy.deepcopy(item)
+
+    def _forget(self, cache: Optional[RequestCache], key: Optional[dict]):
+        if cache is None:
+            return
+        if key is None:
+            cache.invalidate_table(self.name)
+        else:
+            cache.items.pop(_cache_key(self.name, key), None)
+
+    async def get_item(self, **kwargs):
+        cache = _request_cache.get()
+        self._key_names = self._key_names or tuple(kwargs["Key"])
+        cacheable = cache is not None and set(kwargs) == {"Key"}
+        if cacheable:
+            cache_key = _cache_key(self.name, kwargs["Key"])
+            if cache_key in cache.items:
+                cache.saved += 1
+                item = cache.items[cache_key]
+                return {} if item is None else {"Item": copy.deepcopy(item)}
+        response = await run_blocking(self._table.get_item, **kwargs)
+        if cache is not None:
+            cache.reads += 1
+        if cacheable or (cache is not None and set(kwargs) == {"Key", "ConsistentRead"}):
+            self._remember(cache, kwargs["Key"], response.get("Item"))
+        return response
+
+    async def _write(self, method, key: Optional[dict], **kwargs):
+        cache = _request_cache.get()
+        try:
+            response = await run_blocking(method, **kwargs)
+        except Exception:
+            # A failed condition means our copy may be out of date
+            self._forget(cache, key)
+            raise
+        return cache, response
+
+    async def put_item(self, **kwargs):
+        key = self._key_of(kwargs["Item"])
+        cache, response = await self._write(self._table.put_item, key, **kwargs)
+        if cache is not None:
+            if key is None:
+                cache.invalidate_table(self.name)
+            else:
+                self._remember(cache, key, kwargs["Item"])
+        return response
+
+    async def update_item(self, **kwargs):
+        key = kwargs["Key"]
+        self._key_names = self._key_names or tuple(key)
+        cache, response = await self._write(self._table.update_item, key, **kwargs)
+        if kwargs.get("ReturnValues") == "ALL_NEW":
+            self._remember(cache, key, response.get("Attributes"))
+        else:
+            self._forget(cache, key)
+        return response
+
+    async def delete_item(self, **kwargs):
+        key = kwargs["Key"]
+        self._key_names = self._key_names or tuple(key)
+        cache, response = await self._write(self._table.delete_item, key, **kwargs)
+        self._remember(cache, key, None)
+        return response
+
+    async def query(self, **kwargs):
+        return await run_blocking(self._table.query, **kwargs)
+
+    async def query_all(self, **kwargs) -> list:
+        """
+        Run a query to the end, following LastEvaluatedKey across its 1 MB
+        pages, and return all the items.
+        """
+        items = []
+        while True:
+            result = await self.query(**kwargs)
+            items.extend(result.get("Items", []))
+            if "LastEvaluatedKey" not in result:
+                return items
+            kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
+    async def scan(self, **kwargs):
+        return await run_blocking(self._table.scan, **kwargs)
+
+    async def batch_write(self, put_items=(), delete_keys=()):
+        """
+        Write many items with a boto3 batch_writer (25 items per request,
+        unprocessed items are retried by boto3).
+        """
+        def _write():
+            with self._table.batch_writer() as batch:
+                for item in put_items:
+                    batch.put_item(Item=item)
+                for key in delete_keys:
+                    batch.delete_item(Key=key)
+
+        await run_blocking(_write)
+        cache = _request_cache.get()
+        if cache is not None:
+            cache.invalidate_table(self.name)
+
+    async def parallel_scan(self, segments: int, max_pages: int = 2, **kwargs):
+        """
+        Scan the table as `segments` segments in parallel and yield pages of
+        items as they arrive, in no particular order. At most `max_pages`
+        pages wait to be consumed, so memory stays bounded when the consumer
+        is slower than the scan.
+        """
+        pages = asyncio.Queue(maxsize=max_pages)
+        done = object()
+
+        async def scan_segment(segment: int):
+            scan_kwargs = dict(kwargs, Segment=segment, TotalSegments=segments)
+            try:
+                while True:
+                    result = await self.scan(**scan_kwargs)
+                    await pages.put(result.get("Items", []))
+                    if "LastEvaluatedKey" not in result:
+                        break
+                    scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+            except Exception as e:
+                await pages.put(e)
+                return
+            await pages.put(done)
+
+        tasks = [asyncio.create_task(scan_segment(segment)) for segment in range(segments)]
+        try:
+            remaining = segments
+            while remaining:
+                page = await pages.get()
+                if page is done:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            # The consumer stopped early or a segment failed
+            for task in tasks:
+                task.cancel()
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_SIZE = 100
+
+async def batch_get(table_name: str, keys: list, **kwargs) -> list:
+    """
+    Fetch many items by primary key with BatchGetItem, retrying unprocessed keys.
+    Items come back in no particular order; missing keys are skipped.
+    """
+    def _get():
+        items = []
+        for start in range(0, len(keys), BATCH_GET_SIZE):
+            request = {table_name: {"Keys": keys[start:start + BATCH_GET_SIZE], **kwargs}}
+            while request:
+                response = dynamodb.batch_get_item(RequestItems=request)
+                items.extend(response.get("Responses", {}).get(table_name, []))
+                request = response.get("UnprocessedKeys")
+                if request:
+                    # Throttled: back off briefly before retrying the rest
+                    time.sleep(0.05)
+        return items
+
+    if not keys:
+        return []
+    return await run_blocking(_get)
+
+async def transact_write(items: list):
+    """
+    Run TransactWriteItems. Items take plain Python values, like the Table API.
+    Raises ClientError with code TransactionCanceledException if any
+    condition fails; see cancellation_reasons.
+    """
+    cache = _request_cache.get()
+    if cache is not None:
+        # Whether or not the transaction goes through, its items may have changed
+        for item in items:
+            for operation in item.values():
+                cache.invalidate_table(operation["TableName"])
+    return await run_blocking(dynamodb.meta.client.transact_write_items, TransactItems=items)
+
+def cancellation_reasons(error, count: int) -> list:
+    """
+    The per-item failure codes of a cancelled transaction of `count` items,
+    in item order ("None" for items that did not fail, or when DynamoDB did
+    not report a reason for them).
+    """
+    reasons = [reason.get("Code", "None") for reason in error.response.get("CancellationReasons", [])]
+    return (reasons + ["None"] * count)[:count]
+
+_tables = {}
+
+def get_table(name: str) -> AsyncTable:
+    """
+    Return the shared AsyncTable for a DynamoDB table name.
+    """
+    if name not in _tables:
+        _tables[name] = AsyncTable(dynamodb.Table(name))
+    return _tables[name]
+
+# Pagination: DynamoDB's LastEvaluatedKey is handed to clients as an opaque
+# cursor in this response header, so list endpoints keep returning plain lists.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+def encode_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    """
+    Turn a LastEvaluatedKey into a URL-safe cursor string (None when there are no more pages).
+    """
+    if not last_evaluated_key:
+        return None
+    typed_key = {name: _serializer.serialize(value) for name, value in last_evaluated_key.items()}
+    encoded = base64.urlsafe_b64encode(json.dumps(typed_key, separators=(",", ":")).encode())
+    return encoded.decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[dict]:
+    """
+    Turn a cursor produced by encode_cursor back into an ExclusiveStartKey.
+    """
+    if not cursor:
+        return None
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        typed_key = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return {name: _deserializer.deserialize(value) for name, value in typed_key.items()}
+    except (ValueError, TypeError, KeyError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def page_kwargs(limit: int, cursor: Optional[str]) -> dict:
+    """
+    Build the Limit/ExclusiveStartKey arguments for a paginated query or scan.
+    """
+    kwargs = {"Limit": limit}
+    start_key = decode_cursor(cursor)
+    if start_key:
+        kwargs["ExclusiveStartKey"] = start_key
+    return kwargs
+
+def set_next_cursor(response: Response, result: dict):
+    """
+    Expose the cursor for the page after `result` (a query/scan response) to the client.
+    """
+    next_cursor = encode_cursor(result.get("LastEvaluatedKey"))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
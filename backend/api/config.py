@@ -1,6 +1,8 @@
 # backend/api/config.py
 from fastapi_login import LoginManager
 import os
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
 import logging
 from botocore.exceptions import ClientError
@@ -14,19 +16,80 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "default_stripe_secret_key")
 VITE_STRIPE_PUBLISHABLE_KEY = os.getenv("VITE_STRIPE_PUBLISHABLE_KEY", "default_stripe_publishable_key")
 VITE_STRIPE_WEBHOOK_SECRET = os.getenv("VITE_STRIPE_WEBHOOK_SECRET", "default_stripe_webhook_secret")
 
-login_manager = LoginManager(SECRET_KEY, token_url="/users/login")
+# How long a user loaded from DynamoDB is reused; 0 disables the cache
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+# Most users kept in a worker's user cache; the least recently used go first
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+# Claim holding the user's tokenVersion when the token was issued, next to
+# "sub" (the username); tokens carry nothing else about the user
+TOKEN_VERSION_CLAIM = "ver"
+
+
+class VersionedLoginManager(LoginManager):
+    """
+    LoginManager whose tokens identify the user and their tokenVersion only.
+    The current user is the users item from the cached user loader (see
+    load_user), so most requests do not read the users table, and roles
+    are looked up in the admin directory where they are needed. A token is
+    accepted while its user exists and its version matches the user's
+    tokenVersion; bumping tokenVersion revokes the user's tokens. Tokens
+    issued without a version count as version 0.
+    """
+
+    async def _get_current_user(self, payload):
+        user = await super()._get_current_user(payload)
+        if user.get("tokenVersion", 0) != payload.get(TOKEN_VERSION_CLAIM, 0):
+            raise self.not_authenticated_exception
+        return user
+
+
+login_manager = VersionedLoginManager(SECRET_KEY, token_url="/users/login")
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# username -> (expiry, user item), least recently used first
+_user_cache = OrderedDict()
+
+def _cached_user(username: str):
+    cached = _user_cache.get(username)
+    if cached is None:
+        return None
+    if cached[0] <= time.monotonic():
+        del _user_cache[username]
+        return None
+    _user_cache.move_to_end(username)
+    return cached[1]
+
+def _cache_user(username: str, user: dict):
+    if USER_CACHE_TTL_SECONDS <= 0:
+        return
+    _user_cache[username] = (time.monotonic() + USER_CACHE_TTL_SECONDS, user)
+    _user_cache.move_to_end(username)
+    while len(_user_cache) > USER_CACHE_MAX_ENTRIES:
+        _user_cache.popitem(last=False)
+
+def invalidate_user(username: str):
+    """
+    Drop a user from this worker's user cache after their item changed.
+    Other workers see the change within USER_CACHE_TTL_SECONDS.
+    """
+    _user_cache.pop(username, None)
+
 logger.info(f"login_manager._user_callback before registration: {login_manager._user_callback}")
 
 @login_manager.user_loader()
-def load_user(username: str):
+async def load_user(username: str):
+    cached = _cached_user(username)
+    if cached is not None:
+        return cached
     try:
-        from api.db_setup import dynamodb  # Import here to avoid circular imports
-        response = dynamodb.Table('users').get_item(Key={"username": username})
+        from api.aws_wrappers.dynamo import get_table  # Import here to avoid circular imports
+        response = await get_table('users').get_item(Key={"username": username})
         user = response.get("Item")
+        if user is not None:
+            _cache_user(username, user)
         return user
     except ClientError as e:
         logger.error(f"Error loading user from DynamoDB: {e}")
@@ -35,4 +98,4 @@ def load_user(username: str):
 logger.info(f"login_manager._user_callback after registration: {login_manager._user_callback}")
 
 # Export the login_manager for use in other modules
-__all__ = ["login_manager"]
+__all__ = ["login_manager", "invalidate_user", "TOKEN_VERSION_CLAIM"]
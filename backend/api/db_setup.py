@@ -1,6 +1,11 @@
+import hashlib
 import os
+import sys
+import time
 import boto3
+from datetime import datetime
 from dotenv import load_dotenv
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Load environment variables from .env file
@@ -11,14 +16,36 @@ aws_access_key_id = os.getenv('aws_access_key_id')
 aws_secret_access_key = os.getenv('aws_secret_access_key')
 aws_region = os.getenv('aws_region')
 
+# Number of concurrent DynamoDB calls per worker (threads and HTTP connections)
+DYNAMO_MAX_WORKERS = int(os.getenv('DYNAMO_MAX_WORKERS', '32'))
+
 # Create a DynamoDB resource
 dynamodb = boto3.resource(
     'dynamodb',
     aws_access_key_id=aws_access_key_id,
     aws_secret_access_key=aws_secret_access_key,
-    region_name=aws_region
+    region_name=aws_region,
+    config=Config(max_pool_connections=DYNAMO_MAX_WORKERS)
 )
 
+# Posts feed: every post carries feed=FEED_PARTITION, so FeedIndex holds the
+# whole feed in one partition sorted by timestamp
+FEED_INDEX = 'FeedIndex'
+FEED_KEY = 'feed'
+FEED_PARTITION = 'posts'
+
+# Posts of one author sorted by timestamp
+POSTS_AUTHOR_INDEX = 'AuthorIndex'
+
+# Comments of a post in creation order
+COMMENTS_TIME_INDEX = 'PostCreatedIndex'
+
+# Posts of one group sorted by timestamp
+GROUP_POSTS_TIME_INDEX = 'GroupTimeIndex'
+
+# Item of the counters table holding the number of users
+USERS_COUNTER = 'users'
+
 def create_users_table():
     try:
         table = dynamodb.create_table(
@@ -71,6 +98,50 @@ def create_users_table():
         else:
             raise e
 
+def posts_feed_index():
+    return {
+        'IndexName': FEED_INDEX,
+        'KeySchema': [
+            {
+                'AttributeName': FEED_KEY,
+                'KeyType': 'HASH'
+            },
+            {
+                'AttributeName': 'timestamp',
+                'KeyType': 'RANGE'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        },
+        'ProvisionedThroughput': {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    }
+
+def posts_author_index():
+    return {
+        'IndexName': POSTS_AUTHOR_INDEX,
+        'KeySchema': [
+            {
+                'AttributeName': 'author',
+                'KeyType': 'HASH'
+            },
+            {
+                'AttributeName': 'timestamp',
+                'KeyType': 'RANGE'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        },
+        'ProvisionedThroughput': {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    }
+
 def create_posts_table():
     # Delete existing table if it exists
     try:
@@ -94,8 +165,24 @@ def create_posts_table():
                 {
                     'AttributeName': 'postId',
                     'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': FEED_KEY,
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'timestamp',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'author',
+                    'AttributeType': 'S'
                 }
             ],
+            GlobalSecondaryIndexes=[
+                posts_feed_index(),
+                posts_author_index()
+            ],
             ProvisionedThroughput={
                 'ReadCapacityUnits': 5,
                 'WriteCapacityUnits': 5
@@ -109,6 +196,28 @@ def create_posts_table():
         print(f"Error creating table: {e}")
         raise e
 
+def comments_time_index():
+    return {
+        'IndexName': COMMENTS_TIME_INDEX,
+        'KeySchema': [
+            {
+                'AttributeName': 'postId',
+                'KeyType': 'HASH'
+            },
+            {
+                'AttributeName': 'createdAt',
+                'KeyType': 'RANGE'
+            }
+        ],
+        'Projection': {
+            'ProjectionType': 'ALL'
+        },
+        'ProvisionedThroughput': {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    }
+
 def create_comments_table():
     try:
         table = dynamodb.create_table(
@@ -131,6 +240,10 @@ def create_comments_table():
                 {
                     'AttributeName': 'author',
                     'AttributeType': 'S'  # String type for author username
+                },
+                {
+                    'AttributeName': 'createdAt',
+                    'AttributeType': 'S'  # Sortable UTC timestamp
                 }
             ],
             GlobalSecondaryIndexes=[
@@ -165,7 +278,8 @@ def create_comments_table():
                         'ReadCapacityUnits': 5,
                         'WriteCapacityUnits': 5
                     }
-                }
+                },
+                comments_time_index()
             ],
             ProvisionedThroughput={
                 'ReadCapacityUnits': 5,
@@ -259,10 +373,700 @@ def create_groups_table():
             print(f"Error creating table: {e.response['Error']['Message']}")
             raise e
 
+def create_post_topics_table():
+    try:
+        # Inverted index: one item per (topic, post), newest posts sort last
+        table = dynamodb.create_table(
+            TableName='post_topics',
+            KeySchema=[
+                {
+                    'AttributeName': 'topic',
+                    'KeyType': 'HASH'  # Partition key
+                },
+                {
+                    'AttributeName': 'postKey',
+                    'KeyType': 'RANGE'  # "<timestamp>#<postId>"
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'topic',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'postKey',
+                    'AttributeType': 'S'
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating post_topics table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='post_topics')
+        print("Post topics table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("Post topics table already exists.")
+        else:
+            raise e
+
+def create_post_likes_table():
+    try:
+        # One item per (post, user) like
+        table = dynamodb.create_table(
+            TableName='post_likes',
+            KeySchema=[
+                {
+                    'AttributeName': 'postId',
+                    'KeyType': 'HASH'
+                },
+                {
+                    'AttributeName': 'username',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'postId',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'username',
+                    'AttributeType': 'S'
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating post_likes table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='post_likes')
+        print("Post likes table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("Post likes table already exists.")
+        else:
+            raise e
+
+def create_group_posts_table():
+    try:
+        # One item per group post, under the group's partition
+        table = dynamodb.create_table(
+            TableName='group_posts',
+            KeySchema=[
+                {
+                    'AttributeName': 'groupId',
+                    'KeyType': 'HASH'
+                },
+                {
+                    'AttributeName': 'postId',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'groupId',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'postId',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'timestamp',
+                    'AttributeType': 'S'
+                }
+            ],
+            LocalSecondaryIndexes=[
+                {
+                    'IndexName': GROUP_POSTS_TIME_INDEX,
+                    'KeySchema': [
+                        {
+                            'AttributeName': 'groupId',
+                            'KeyType': 'HASH'
+                        },
+                        {
+                            'AttributeName': 'timestamp',
+                            'KeyType': 'RANGE'
+                        }
+                    ],
+                    'Projection': {
+                        'ProjectionType': 'ALL'
+                    }
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating group_posts table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='group_posts')
+        print("Group posts table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("Group posts table already exists.")
+        else:
+            raise e
+
+def create_topic_trends_table():
+    try:
+        # Post counters per (time bucket, topic); hour/day buckets expire via TTL
+        table = dynamodb.create_table(
+            TableName='topic_trends',
+            KeySchema=[
+                {
+                    'AttributeName': 'bucket',
+                    'KeyType': 'HASH'  # "hour#<YYYY-MM-DDTHH>", "day#<YYYY-MM-DD>" or "all"
+                },
+                {
+                    'AttributeName': 'topic',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'bucket',
+                    'AttributeType': 'S'
+                },
+                {
+                    'AttributeName': 'topic',
+                    'AttributeType': 'S'
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating topic_trends table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='topic_trends')
+        table.meta.client.update_time_to_live(
+            TableName='topic_trends',
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expiresAt'}
+        )
+        print("Topic trends table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("Topic trends table already exists.")
+        else:
+            raise e
+
+def create_user_tokens_table():
+    try:
+        # Email verification and password reset tokens, keyed by their SHA-256
+        # hash; expired tokens are deleted via TTL
+        table = dynamodb.create_table(
+            TableName='user_tokens',
+            KeySchema=[
+                {
+                    'AttributeName': 'tokenHash',
+                    'KeyType': 'HASH'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'tokenHash',
+                    'AttributeType': 'S'
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating user_tokens table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='user_tokens')
+        table.meta.client.update_time_to_live(
+            TableName='user_tokens',
+            TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'expiresAt'}
+        )
+        print("User tokens table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("User tokens table already exists.")
+        else:
+            raise e
+
+def create_counters_table():
+    try:
+        # Counters maintained with atomic ADD updates, one item each
+        table = dynamodb.create_table(
+            TableName='counters',
+            KeySchema=[
+                {
+                    'AttributeName': 'counterId',
+                    'KeyType': 'HASH'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'counterId',
+                    'AttributeType': 'S'
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating counters table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='counters')
+        print("Counters table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("Counters table already exists.")
+        else:
+            raise e
+
+def create_user_emails_table():
+    try:
+        # Email uniqueness claims: one item per registered email, naming the
+        # user that holds it, written in the same transaction as the user
+        table = dynamodb.create_table(
+            TableName='user_emails',
+            KeySchema=[
+                {
+                    'AttributeName': 'email',
+                    'KeyType': 'HASH'
+                }
+            ],
+            AttributeDefinitions=[
+                {
+                    'AttributeName': 'email',
+                    'AttributeType': 'S'
+                }
+            ],
+            ProvisionedThroughput={
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        )
+        print("Creating user_emails table...")
+        table.meta.client.get_waiter('table_exists').wait(TableName='user_emails')
+        print("User emails table created successfully.")
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ResourceInUseException':
+            print("User emails table already exists.")
+        else:
+            raise e
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def user_token_item(token: str, username: str, purpose: str, expiry: datetime) -> dict:
+    """
+    The user_tokens item of a token; only its hash is stored. `expiry` is a
+    naive UTC datetime.
+    """
+    return {
+        'tokenHash': hash_token(token),
+        'username': username,
+        'purpose': purpose,
+        'expiresAt': int((expiry - datetime(1970, 1, 1)).total_seconds())
+    }
+
+
+# MIGRATIONS: bring existing tables up to the current schema without recreating them.
+# Run with `python -m api.db_setup migrate` from the backend directory.
+
+def add_global_index(table_name, index, attribute_definitions):
+    """
+    Create a GSI on an existing table and wait until it is active.
+    Does nothing if the index already exists.
+    """
+    client = dynamodb.meta.client
+    description = client.describe_table(TableName=table_name)['Table']
+    existing = [i['IndexName'] for i in description.get('GlobalSecondaryIndexes', [])]
+    if index['IndexName'] in existing:
+        print(f"{table_name}.{index['IndexName']} already exists.")
+        return
+
+    if description.get('BillingModeSummary', {}).get('BillingMode') == 'PAY_PER_REQUEST':
+        index = {k: v for k, v in index.items() if k != 'ProvisionedThroughput'}
+
+    client.update_table(
+        TableName=table_name,
+        AttributeDefinitions=attribute_definitions,
+        GlobalSecondaryIndexUpdates=[{'Create': index}]
+    )
+    print(f"Creating {table_name}.{index['IndexName']}...")
+    while True:
+        description = client.describe_table(TableName=table_name)['Table']
+        status = next(i['IndexStatus'] for i in description['GlobalSecondaryIndexes'] if i['IndexName'] == index['IndexName'])
+        if status == 'ACTIVE':
+            break
+        time.sleep(10)
+    print(f"{table_name}.{index['IndexName']} created successfully.")
+
+def scan_all(table, **kwargs):
+    """
+    Yield every item of a table, following scan pagination.
+    """
+    response = table.scan(**kwargs)
+    yield from response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **kwargs)
+        yield from response.get('Items', [])
+
+def migrate_posts_feed():
+    """
+    Add FeedIndex to the posts table and put existing posts into it:
+    set the feed key and rewrite timestamps in the sortable UTC format.
+    """
+    from api.models.timestamps import format_timestamp
+    from datetime import datetime
+
+    add_global_index('posts', posts_feed_index(), [
+        {'AttributeName': FEED_KEY, 'AttributeType': 'S'},
+        {'AttributeName': 'timestamp', 'AttributeType': 'S'}
+    ])
+
+    table = dynamodb.Table('posts')
+    updated = 0
+    for post in scan_all(table):
+        timestamp = post.get('timestamp')
+        try:
+            timestamp = format_timestamp(datetime.fromisoformat(str(timestamp).replace('Z', '+00:00')))
+        except ValueError:
+            timestamp = format_timestamp(datetime(1970, 1, 1))
+        if post.get(FEED_KEY) == FEED_PARTITION and post.get('timestamp') == timestamp:
+            continue
+        table.update_item(
+            Key={'postId': post['postId']},
+            UpdateExpression='SET #feed = :feed, #timestamp = :timestamp',
+            ExpressionAttributeNames={'#feed': FEED_KEY, '#timestamp': 'timestamp'},
+            ExpressionAttributeValues={':feed': FEED_PARTITION, ':timestamp': timestamp}
+        )
+        updated += 1
+    print(f"Added {updated} posts to {FEED_INDEX}.")
+
+def migrate_posts_author_index():
+    """
+    Add the author/timestamp index to the posts table.
+    Runs after migrate_posts_feed, which normalizes the timestamps it sorts by.
+    """
+    add_global_index('posts', posts_author_index(), [
+        {'AttributeName': 'author', 'AttributeType': 'S'},
+        {'AttributeName': 'timestamp', 'AttributeType': 'S'}
+    ])
+
+def migrate_comments():
+    """
+    Add PostCreatedIndex to the comments table, give comments without a
+    creation time their post's timestamp, and set commentCount on posts that
+    do not have one yet (counts maintained by the API are left alone).
+    """
+    from collections import Counter
+
+    add_global_index('comments', comments_time_index(), [
+        {'AttributeName': 'postId', 'AttributeType': 'S'},
+        {'AttributeName': 'createdAt', 'AttributeType': 'S'}
+    ])
+
+    posts_table = dynamodb.Table('posts')
+    comments_table = dynamodb.Table('comments')
+    post_timestamps = {
+        post['postId']: post.get('timestamp')
+        for post in scan_all(posts_table, ProjectionExpression='postId, #timestamp', ExpressionAttributeNames={'#timestamp': 'timestamp'})
+    }
+
+    comment_counts = Counter()
+    for comment in scan_all(comments_table):
+        comment_counts[comment['postId']] += 1
+        if 'createdAt' not in comment:
+            comments_table.update_item(
+                Key={'commentId': comment['commentId']},
+                UpdateExpression='SET createdAt = :createdAt',
+                ExpressionAttributeValues={':createdAt': post_timestamps.get(comment['postId']) or '1970-01-01T00:00:00.000Z'}
+            )
+
+    for post_id in post_timestamps:
+        posts_table.update_item(
+            Key={'postId': post_id},
+            UpdateExpression='SET commentCount = if_not_exists(commentCount, :count)',
+            ExpressionAttributeValues={':count': comment_counts[post_id]}
+        )
+    print(f"Set comment counts on {len(post_timestamps)} posts.")
+
+def migrate_post_topics():
+    """
+    Create the post_topics index table and add an entry for every topic of every post.
+    """
+    create_post_topics_table()
+
+    table = dynamodb.Table('post_topics')
+    entries = 0
+    with table.batch_writer(overwrite_by_pkeys=['topic', 'postKey']) as batch:
+        for post in scan_all(dynamodb.Table('posts')):
+            for topic in post.get('topics', []):
+                batch.put_item(Item={
+                    'topic': topic,
+                    'postKey': f"{post['timestamp']}#{post['postId']}",
+                    'postId': post['postId']
+                })
+                entries += 1
+    print(f"Wrote {entries} post_topics entries.")
+
+def migrate_topic_trends():
+    """
+    Create the topic_trends table and set every counter from the existing posts.
+    Counters are written as absolute values, so re-running is safe.
+    """
+    from collections import Counter
+    from datetime import datetime, timezone
+    from api.nlp.trends import topic_buckets, parse_timestamp
+
+    create_topic_trends_table()
+
+    now = int(datetime.now(timezone.utc).timestamp())
+    counts = Counter()
+    expiry = {}
+    for post in scan_all(dynamodb.Table('posts')):
+        for bucket, expires_at in topic_buckets(parse_timestamp(post['timestamp'])):
+            if expires_at is not None and expires_at <= now:
+                continue
+            expiry[bucket] = expires_at
+            for topic in post.get('topics', []):
+                counts[(bucket, topic)] += 1
+
+    with dynamodb.Table('topic_trends').batch_writer() as batch:
+        for (bucket, topic), count in counts.items():
+            item = {'bucket': bucket, 'topic': topic, 'postCount': count}
+            if expiry[bucket] is not None:
+                item['expiresAt'] = expiry[bucket]
+            batch.put_item(Item=item)
+    print(f"Wrote {len(counts)} topic trend counters.")
+
+def migrate_post_likes_to_sets():
+    """
+    Convert likedBy lists on posts into string sets (removing empty ones)
+    and set likes to the number of distinct likers.
+    """
+    from boto3.dynamodb.conditions import Attr
+
+    posts_table = dynamodb.Table('posts')
+    converted = 0
+    for post in scan_all(posts_table, FilterExpression=Attr('likedBy').attribute_type('L')):
+        likers = set(post['likedBy'])
+        values = {':old': post['likedBy'], ':likes': len(likers)}
+        if likers:
+            update_expression = 'SET likedBy = :likers, likes = :likes'
+            values[':likers'] = likers
+        else:
+            update_expression = 'REMOVE likedBy SET likes = :likes'
+        try:
+            posts_table.update_item(
+                Key={'postId': post['postId']},
+                UpdateExpression=update_expression,
+                ConditionExpression='likedBy = :old',
+                ExpressionAttributeValues=values
+            )
+            converted += 1
+        except ClientError as e:
+            # Liked meanwhile: the API converts it itself
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise e
+    print(f"Converted likedBy on {converted} posts.")
+
+def migrate_post_likes_table():
+    """
+    Create the post_likes table, move every post's likedBy set into it and
+    drop likedBy from the post. Posts liked while this runs are moved by
+    the API instead.
+    """
+    create_post_likes_table()
+
+    posts_table = dynamodb.Table('posts')
+    likes_table = dynamodb.Table('post_likes')
+    moved = 0
+    for post in scan_all(posts_table, ProjectionExpression='postId, likedBy'):
+        if 'likedBy' not in post:
+            continue
+        likers = set(post['likedBy'])
+        with likes_table.batch_writer(overwrite_by_pkeys=['postId', 'username']) as batch:
+            for username in likers:
+                batch.put_item(Item={'postId': post['postId'], 'username': username})
+        try:
+            posts_table.update_item(
+                Key={'postId': post['postId']},
+                UpdateExpression='SET likes = :likes REMOVE likedBy',
+                ConditionExpression='likedBy = :old',
+                ExpressionAttributeValues={':old': post['likedBy'], ':likes': len(likers)}
+            )
+            moved += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise e
+    print(f"Moved likes of {moved} posts to post_likes.")
+
+def group_post_item(group_id: str, post: dict) -> dict:
+    """
+    The group_posts item for a post embedded in a group's posts list.
+    """
+    from api.models.timestamps import format_timestamp
+    from api.nlp.trends import parse_timestamp
+
+    item = {**post, 'groupId': group_id}
+    try:
+        item['timestamp'] = format_timestamp(parse_timestamp(post['timestamp']))
+    except (KeyError, ValueError):
+        item['timestamp'] = '1970-01-01T00:00:00.000Z'
+    likers = set(item.pop('likedBy', None) or [])
+    if likers:
+        item['likedBy'] = likers
+    # Older posts recorded their likers without a likes counter
+    item.setdefault('likes', len(likers))
+    return item
+
+def migrate_group_posts():
+    """
+    Create the group_posts table and move every group's embedded posts list
+    into it. Groups changed while this runs are moved by the API instead.
+    """
+    create_group_posts_table()
+
+    groups_table = dynamodb.Table('groups')
+    group_posts_table = dynamodb.Table('group_posts')
+    moved = 0
+    for group in scan_all(groups_table, ProjectionExpression='groupId, posts'):
+        if 'posts' not in group:
+            continue
+        with group_posts_table.batch_writer(overwrite_by_pkeys=['groupId', 'postId']) as batch:
+            for post in group['posts']:
+                batch.put_item(Item=group_post_item(group['groupId'], post))
+        try:
+            groups_table.update_item(
+                Key={'groupId': group['groupId']},
+                UpdateExpression='SET postCount = :count REMOVE posts',
+                ConditionExpression='posts = :old',
+                ExpressionAttributeValues={':old': group['posts'], ':count': len(group['posts'])}
+            )
+            moved += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise e
+    print(f"Moved the posts of {moved} groups to group_posts.")
+
+# Token attributes formerly stored on user items, by purpose
+LEGACY_USER_TOKENS = {
+    'verify_email': ('verification_token', 'token_expiry'),
+    'reset_password': ('password_reset_token', 'password_reset_expiry'),
+}
+
+def migrate_user_tokens():
+    """
+    Create the user_tokens table and move the outstanding verification and
+    password reset tokens stored on user items into it, hashed.
+    """
+    create_user_tokens_table()
+
+    users_table = dynamodb.Table('users')
+    tokens_table = dynamodb.Table('user_tokens')
+    token_attributes = [name for attributes in LEGACY_USER_TOKENS.values() for name in attributes]
+    moved = 0
+    for user in scan_all(users_table, ProjectionExpression=', '.join(['username'] + token_attributes)):
+        if not any(name in user for name in token_attributes):
+            continue
+        for purpose, (token_name, expiry_name) in LEGACY_USER_TOKENS.items():
+            if token_name not in user:
+                continue
+            try:
+                expiry = datetime.fromisoformat(user[expiry_name])
+            except (KeyError, ValueError):
+                continue
+            if expiry > datetime.utcnow():
+                tokens_table.put_item(Item=user_token_item(user[token_name], user['username'], purpose, expiry))
+                moved += 1
+        users_table.update_item(
+            Key={'username': user['username']},
+            UpdateExpression='REMOVE ' + ', '.join(token_attributes)
+        )
+    print(f"Moved {moved} unexpired tokens to user_tokens.")
+
+def migrate_user_count():
+    """
+    Create the counters table and set the users counter to the number of
+    users. Users registered or deleted while this runs can be miscounted;
+    running it again corrects the counter.
+    """
+    create_counters_table()
+
+    users_table = dynamodb.Table('users')
+    count = 0
+    kwargs = {}
+    while True:
+        response = users_table.scan(Select='COUNT', **kwargs)
+        count += response['Count']
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    dynamodb.Table('counters').put_item(Item={'counterId': USERS_COUNTER, 'count': count})
+    print(f"Users counter set to {count}.")
+
+def migrate_user_emails():
+    """
+    Create the user_emails table and claim the email of every existing user.
+    Existing claims are kept; when several users share an email, only the
+    first one scanned gets the claim and the others are listed.
+    """
+    create_user_emails_table()
+
+    users_table = dynamodb.Table('users')
+    emails_table = dynamodb.Table('user_emails')
+    claimed = 0
+    for user in scan_all(users_table, ProjectionExpression='username, email'):
+        if not user.get('email'):
+            continue
+        email = user['email'].lower()
+        try:
+            emails_table.put_item(
+                Item={'email': email, 'username': user['username']},
+                ConditionExpression='attribute_not_exists(email) OR username = :username',
+                ExpressionAttributeValues={':username': user['username']}
+            )
+            claimed += 1
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            print(f"Email {email} of {user['username']} is already claimed by another user.")
+    print(f"Claimed {claimed} emails in user_emails.")
+
+MIGRATIONS = [
+    migrate_posts_feed,
+    migrate_comments,
+    migrate_posts_author_index,
+    migrate_post_topics,
+    migrate_topic_trends,
+    migrate_post_likes_to_sets,
+    migrate_post_likes_table,
+    migrate_group_posts,
+    migrate_user_tokens,
+    migrate_user_count,
+    migrate_user_emails,
+]
+
+def run_migrations():
+    for migration in MIGRATIONS:
+        print(f"Running {migration.__name__}...")
+        migration()
 
 
 if __name__ == "__main__":
-    create_users_table()
-    create_posts_table()
-    create_comments_table()
-    create_groups_table()
\ No newline at end of file
+    if sys.argv[1:] == ["migrate"]:
+        run_migrations()
+    else:
+        create_users_table()
+        create_posts_table()
+        create_comments_table()
+        create_groups_table()
+        create_post_topics_table()
+        create_topic_trends_table()
+        create_post_likes_table()
+        create_group_posts_table()
+        create_user_tokens_table()
+        create_counters_table()
+        create_user_emails_table()
\ No newline at end of file
@@ -2,19 +2,18 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from api.config import login_manager
+from api.aws_wrappers.dynamo import NEXT_CURSOR_HEADER, request_cache
 from api.routers import users, posts, comments, chat, groups, fitness, overpass, donations, forms
+from api.nlp import keywords
+from api.services import passwords, admins
 from starlette.middleware.sessions import SessionMiddleware
-import nltk
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
-# Download all required NLTK data during startup
-try:
-    nltk.download('punkt')
-    nltk.download('averaged_perceptron_tagger')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-except Exception as e:
-    print(f"Warning: Failed to download NLTK data: {e}")
+# Response header with the number of DynamoDB reads served from the request cache
+READS_SAVED_HEADER = "X-Dynamo-Reads-Saved"
 
 app = FastAPI(
     title="Veterans Society API",
@@ -35,6 +34,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"], 
+    expose_headers=[NEXT_CURSOR_HEADER, READS_SAVED_HEADER],
 )
 
 @app.middleware("http")
@@ -45,6 +45,36 @@ async def force_https_redirects(request: Request, call_next):
     response = await call_next(request)
     return response
 
+@app.middleware("http")
+async def cache_reads_per_request(request: Request, call_next):
+    # Repeated reads of the same item within a request are served from memory
+    with request_cache() as cache:
+        response = await call_next(request)
+    response.headers[READS_SAVED_HEADER] = str(cache.saved)
+    if cache.saved:
+        logger.info(f"{request.method} {request.url.path}: {cache.reads} DynamoDB reads, {cache.saved} served from the request cache")
+    return response
+
+@app.on_event("startup")
+async def warm_in_memory_indexes():
+    # Build the in-memory indexes from DynamoDB, then keep them fresh in the background
+    await asyncio.gather(
+        keywords.warm_keyword_trends(),
+        groups.warm_group_search_index(),
+        users.warm_user_search_index(),
+        admins.load_admin_directory(),
+    )
+    app.state.background_tasks = [
+        asyncio.create_task(keywords.refresh_keyword_trends()),
+        asyncio.create_task(groups.refresh_group_search_index()),
+        asyncio.create_task(users.refresh_user_search_index()),
+        asyncio.create_task(admins.refresh_admin_directory()),
+    ]
+
+@app.on_event("shutdown")
+def stop_password_hashing():
+    passwords.shutdown()
+
 app.include_router(users.router)
 app.include_router(chat.router)
 app.include_router(posts.router)
@@ -1,9 +1,11 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 import uuid
+from api.models.timestamps import sortable_timestamp
 
 class Comment(BaseModel):
     commentId: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique identifier for the comment")
     postId: str = Field(..., description="Unique identifier of the associated post")
     author: str = Field(..., description="Username of the comment's author")
     content: str = Field(..., description="Content of the comment")
+    createdAt: str = Field(default_factory=sortable_timestamp, description="Timestamp of the comment")
@@ -4,10 +4,23 @@ from typing import List, Optional
 import uuid
 from api.models.post import Post
 
+class GroupPost(Post):
+    groupId: Optional[str] = Field(None, description="Group the post belongs to")
+    likedBy: List[str] = Field(default_factory=list, description="Usernames of the users who like the post")
+
 class Group(BaseModel):
     groupId: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique identifier for the group")
     name: str = Field(..., description="Name of the group")
     description: str = Field(..., description="Description of the group")
     author: str = Field(..., description="Author or creator of the group")
     image: str = Field(None, description="URL of the group's image")  # Image URL field, optional
-    posts: List[Post] = Field(default_factory=list, description="List of posts associated with the group")  # Default to empty list
+    postCount: int = Field(default=0, description="Number of posts in the group")
+    posts: List[GroupPost] = Field(default_factory=list, description="List of posts associated with the group")  # Default to empty list
+
+class GroupSummary(BaseModel):
+    groupId: str = Field(..., description="Unique identifier for the group")
+    name: str = Field(..., description="Name of the group")
+    description: str = Field(..., description="Description of the group")
+    author: str = Field(..., description="Author or creator of the group")
+    image: Optional[str] = Field(None, description="URL of the group's image")
+    postCount: int = Field(default=0, description="Number of posts in the group")
@@ -2,7 +2,8 @@ from fastapi import UploadFile
 from pydantic import BaseModel, Field
 from typing import Set, Optional, List
 import uuid
-from datetime import datetime
+from api.models.comment import Comment
+from api.models.timestamps import sortable_timestamp
 
 class Post(BaseModel):
     postId: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique identifier for the post")
@@ -11,12 +12,15 @@ class Post(BaseModel):
     topics: Set[str] = Field(default={"general"}, description="Set of topics associated with the post")
     images: Set[str] = Field(default={"none"}, description="Set of vector embeddings or image references")
     likes: int = Field(default=0, description="Number of likes on the post")
-    likedBy: List[str] = Field(default_factory=list)
-    timestamp: str = Field(default_factory=lambda: str(datetime.now()), description="Timestamp of the post")
+    isLiked: bool = Field(default=False, description="Whether the requesting user likes the post")
+    commentCount: int = Field(default=0, description="Number of comments on the post")
+    timestamp: str = Field(default_factory=sortable_timestamp, description="Timestamp of the post")
     
+class FeedPost(Post):
+    comments: List[Comment] = Field(default_factory=list, description="First comments on the post")
+
 class UpdatePostModel(BaseModel):
     content: Optional[str] = None
-    likes: Optional[int] = None
     topics: Optional[Set[str]] = None
 
 class LikeRequest(BaseModel):
@@ -0,0 +1,13 @@
+from datetime import datetime, timezone
+
+def format_timestamp(moment: datetime) -> str:
+    """
+    Format a datetime as a fixed-width UTC ISO-8601 string, so string order matches time order.
+    Naive datetimes are treated as UTC.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def sortable_timestamp() -> str:
+    return format_timestamp(datetime.now(timezone.utc))
@@ -0,0 +1,82 @@
+from collections import Counter, defaultdict
+from typing import Iterable, List, Optional, Tuple
+import heapq
+import threading
+
+
+class InterestIndex:
+    """
+    In-memory inverted index from each interest to the users who have it,
+    for "people like you" suggestions.
+
+    Ranking a user's matches only reads the user lists of their own
+    interests, so it costs the number of users sharing an interest with them
+    rather than the number of users.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._interests = {}
+        self._users = defaultdict(set)
+
+    def __len__(self):
+        return len(self._interests)
+
+    def _unindex(self, username: str):
+        for interest in self._interests.pop(username, ()):
+            self._users[interest].discard(username)
+            if not self._users[interest]:
+                del self._users[interest]
+
+    def _index(self, username: str, interests: Optional[Iterable[str]]):
+        self._interests[username] = frozenset(interests or ())
+        for interest in self._interests[username]:
+            self._users[interest].add(username)
+
+    def set(self, username: str, interests: Optional[Iterable[str]]):
+        """
+        Add a user, replacing their previous interests.
+        """
+        with self._lock:
+            self._unindex(username)
+            self._index(username, interests)
+
+    def remove(self, username: str):
+        with self._lock:
+            self._unindex(username)
+
+    def replace_all(self, users: Iterable[Tuple[str, Optional[Iterable[str]]]]):
+        """
+        Rebuild the index from scratch, swapping it in once complete.
+        """
+        fresh = InterestIndex()
+        for username, interests in users:
+            fresh._index(username, interests)
+        with self._lock:
+            self._interests, self._users = fresh._interests, fresh._users
+
+    def interests(self, username: str) -> Optional[frozenset]:
+        return self._interests.get(username)
+
+    def similar(self, interests: Iterable[str], limit: int, exclude: str = None, fill: int = 0) -> List[str]:
+        """
+        Up to `limit` usernames, most shared interests first. If fewer than
+        `fill` users share an interest, users without any in common are
+        added until there are `fill`.
+        """
+        with self._lock:
+            shared = Counter()
+            for interest in set(interests):
+                shared.update(self._users.get(interest, ()))
+            shared.pop(exclude, None)
+            matches = [username for username, _ in heapq.nlargest(limit, shared.items(), key=lambda item: item[1])]
+
+            padding = min(fill, limit) - len(matches)
+            if padding > 0:
+                for username in self._interests:
+                    if padding == 0:
+                        break
+                    if username != exclude and username not in shared:
+                        matches.append(username)
+                        padding -= 1
+        return matches
@@ -0,0 +1,192 @@
+from operator import itemgetter
+from typing import Iterable, List, Optional, Tuple
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from api.aws_wrappers.dynamo import get_table
+from api.db_setup import FEED_INDEX, FEED_KEY, FEED_PARTITION
+from api.nlp.trends import parse_timestamp
+from api.nlp.stopwords import load_stopwords
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Number of keywords the trending endpoint can return
+TRENDING_KEYWORDS_K = int(os.getenv('TRENDING_KEYWORDS_K', '50'))
+# Time for a keyword's weight to halve
+TRENDING_KEYWORDS_HALF_LIFE_HOURS = float(os.getenv('TRENDING_KEYWORDS_HALF_LIFE_HOURS', '24'))
+# How many recent posts to rebuild from at startup and on every refresh
+TRENDING_KEYWORDS_WARM_POSTS = int(os.getenv('TRENDING_KEYWORDS_WARM_POSTS', '2000'))
+# Rebuild interval, so every worker also sees posts written by the others
+TRENDING_KEYWORDS_REFRESH_SECONDS = int(os.getenv('TRENDING_KEYWORDS_REFRESH_SECONDS', '600'))
+
+# Counters monitored per top-k slot; more counters mean smaller over-estimates
+COUNTERS_PER_SLOT = 10
+
+posts_table = get_table('posts')
+
+
+def extract_keywords(content: str) -> List[str]:
+    stop_words = load_stopwords()
+    # Simple word splitting instead of word_tokenize
+    words = str(content).lower().split()
+    return [word for word in words if word.isalnum() and word not in stop_words]
+
+
+class KeywordTrends:
+    """
+    Streaming top-k keywords with exponential time decay.
+
+    Uses the SpaceSaving algorithm over a fixed number of counters, so memory
+    stays bounded however many posts are ingested. Decay is "forward" decay:
+    a keyword seen at time t is added with weight 2^((t - landmark) / half_life),
+    and counts are scaled back to the present only when read. Old counts never
+    have to be touched, and the ranking only changes on ingest.
+    """
+
+    # Rescale before the weights grow towards float overflow (2^1024)
+    MAX_EXPONENT = 512
+
+    def __init__(self, k: int = TRENDING_KEYWORDS_K, half_life_hours: float = TRENDING_KEYWORDS_HALF_LIFE_HOURS):
+        self.k = k
+        self.capacity = k * COUNTERS_PER_SLOT
+        self.half_life = half_life_hours * 3600
+        self._lock = threading.Lock()
+        self._landmark = time.time()
+        self._counts = {}
+        # Min-heap of (count, word); entries whose count is out of date are skipped lazily
+        self._heap = []
+        self._ranking = None
+
+    def _exponent(self, moment: float) -> float:
+        return (moment - self._landmark) / self.half_life
+
+    def _rescale(self, moment: float):
+        factor = 2 ** -self._exponent(moment)
+        self._counts = {word: count * factor for word, count in self._counts.items()}
+        self._heap = [(count, word) for word, count in self._counts.items()]
+        heapq.heapify(self._heap)
+        self._landmark = moment
+
+    def _pop_min(self) -> Tuple[float, str]:
+        while True:
+            count, word = heapq.heappop(self._heap)
+            if self._counts.get(word) == count:
+                return count, word
+
+    def _add(self, word: str, weight: float):
+        count = self._counts.get(word)
+        if count is None:
+            if len(self._counts) >= self.capacity:
+                # Replace the smallest counter; the newcomer inherits its count
+                # as an upper bound on what it may have missed
+                min_count, min_word = self._pop_min()
+                del self._counts[min_word]
+                count = min_count
+            else:
+                count = 0.0
+        count += weight
+        self._counts[word] = count
+        heapq.heappush(self._heap, (count, word))
+
+    def ingest(self, content: str, moment: Optional[float] = None):
+        """
+        Count the keywords of one post written at `moment` (epoch seconds, default now).
+        """
+        words = extract_keywords(content)
+        if not words:
+            return
+        moment = time.time() if moment is None else moment
+        with self._lock:
+            if self._exponent(moment) > self.MAX_EXPONENT:
+                self._rescale(moment)
+            weight = 2 ** self._exponent(moment)
+            for word in words:
+                self._add(word, weight)
+            if len(self._heap) > 4 * self.capacity:
+                self._heap = [(count, word) for word, count in self._counts.items()]
+                heapq.heapify(self._heap)
+            self._ranking = None
+
+    def top(self, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        The highest-weighted keywords with their counts decayed to now.
+        """
+        limit = self.k if limit is None else min(limit, self.k)
+        with self._lock:
+            if self._ranking is None:
+                self._ranking = heapq.nlargest(self.k, self._counts.items(), key=itemgetter(1))
+            ranking = self._ranking
+            factor = 2 ** -self._exponent(time.time())
+        decayed = ((word, round(count * factor, 3)) for word, count in ranking)
+        return [(word, count) for word, count in decayed if count > 0][:limit]
+
+
+keyword_trends = KeywordTrends()
+
+
+def build_keyword_trends(posts: Iterable[dict]) -> KeywordTrends:
+    trends = KeywordTrends(keyword_trends.k, keyword_trends.half_life / 3600)
+    for post in posts:
+        if 'content' not in post:
+            continue
+        try:
+            moment = parse_timestamp(post['timestamp']).timestamp()
+        except (KeyError, ValueError):
+            moment = None
+        trends.ingest(post['content'], moment)
+    return trends
+
+async def recent_posts(count: int) -> List[dict]:
+    posts = []
+    kwargs = {}
+    while len(posts) < count:
+        result = await posts_table.query(
+            IndexName=FEED_INDEX,
+            KeyConditionExpression=Key(FEED_KEY).eq(FEED_PARTITION),
+            ScanIndexForward=False,
+            ProjectionExpression="content, #ts",
+            ExpressionAttributeNames={"#ts": "timestamp"},
+            Limit=min(count - len(posts), 500),
+            **kwargs
+        )
+        posts.extend(result.get("Items", []))
+        if "LastEvaluatedKey" not in result:
+            break
+        kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+    return posts
+
+async def warm_keyword_trends():
+    """
+    Rebuild the keyword counters from the most recent posts and swap them in.
+    """
+    global keyword_trends
+    try:
+        posts = await recent_posts(TRENDING_KEYWORDS_WARM_POSTS)
+    except ClientError as e:
+        logger.error(f"Failed to load posts for keyword trends: {e}")
+        return
+    try:
+        keyword_trends = build_keyword_trends(reversed(posts))
+    except Exception as e:
+        logger.error(f"Error in keyword extraction: {str(e)}")
+        return
+    logger.info(f"Keyword trends built from {len(posts)} posts")
+
+async def refresh_keyword_trends():
+    while True:
+        await asyncio.sleep(TRENDING_KEYWORDS_REFRESH_SECONDS)
+        await warm_keyword_trends()
+
+def ingest_post(content: str):
+    try:
+        keyword_trends.ingest(content)
+    except Exception as e:
+        logger.error(f"Error in keyword extraction: {str(e)}")
+
+def trending_keywords(limit: Optional[int] = None) -> List[Tuple[str, float]]:
+    return keyword_trends.top(limit)
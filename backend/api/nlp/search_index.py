@@ -0,0 +1,158 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import re
+import threading
+import unicodedata
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text) -> str:
+    """
+    Lowercase, strip accents and collapse everything but letters and digits
+    to single spaces, so "Café-Runners" and "cafe runners" index the same.
+    """
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over a few text fields of small documents
+    (groups, user profiles), for ranked substring and fuzzy search.
+
+    Each document is stored as given (callers pass only the fields they want
+    returned) and its normalized fields are split into trigrams, each mapped
+    to the documents containing it. A query reads the postings of its own
+    trigrams only, so its cost does not depend on the number of documents.
+    """
+
+    # Share of a query's trigrams a field must contain to match without
+    # containing the whole query (tolerates typos)
+    MIN_OVERLAP = 0.6
+    # Queries shorter than a trigram are matched against word prefixes
+    SHORT_QUERY = 3
+
+    def __init__(self, fields: Dict[str, float]):
+        """
+        `fields` maps each searchable field to its weight in the ranking.
+        """
+        self.fields = fields
+        self._lock = threading.Lock()
+        self._docs = {}
+        self._texts = {}
+        self._postings = defaultdict(set)
+        self._prefixes = defaultdict(set)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _word_prefixes(self, text: str) -> set:
+        # Prefixes of every word, up to SHORT_QUERY - 1 characters long
+        return {word[:length] for word in text.split() for length in range(1, self.SHORT_QUERY)}
+
+    def _unindex(self, doc_id: str):
+        for text in self._texts.pop(doc_id, {}).values():
+            for gram in trigrams(text):
+                self._postings[gram].discard(doc_id)
+                if not self._postings[gram]:
+                    del self._postings[gram]
+            for prefix in self._word_prefixes(text):
+                self._prefixes[prefix].discard(doc_id)
+                if not self._prefixes[prefix]:
+                    del self._prefixes[prefix]
+        self._docs.pop(doc_id, None)
+
+    def _index(self, doc_id: str, doc: dict):
+        texts = {field: normalize(doc.get(field)) for field in self.fields}
+        self._docs[doc_id] = doc
+        self._texts[doc_id] = texts
+        for text in texts.values():
+            for gram in trigrams(text):
+                self._postings[gram].add(doc_id)
+            for prefix in self._word_prefixes(text):
+                self._prefixes[prefix].add(doc_id)
+
+    def add(self, doc_id: str, doc: dict):
+        """
+        Add a document, replacing any previous version with the same id.
+        """
+        with self._lock:
+            self._unindex(doc_id)
+            self._index(doc_id, doc)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._unindex(doc_id)
+
+    def replace_all(self, docs: Iterable[Tuple[str, dict]]):
+        """
+        Rebuild the index from scratch, swapping it in once complete.
+        """
+        fresh = TrigramIndex(self.fields)
+        for doc_id, doc in docs:
+            fresh._index(doc_id, doc)
+        with self._lock:
+            self._docs, self._texts = fresh._docs, fresh._texts
+            self._postings, self._prefixes = fresh._postings, fresh._prefixes
+
+    def get(self, doc_id: str) -> Optional[dict]:
+        return self._docs.get(doc_id)
+
+    def _score(self, text: str, query: str, overlap: float) -> float:
+        position = text.find(query)
+        if position == 0:
+            return 3.0
+        if position > 0:
+            # Start of a word ranks above the middle of one
+            return 2.0 if text[position - 1] == " " else 1.5
+        return overlap
+
+    def search(self, query: str, limit: int) -> List[dict]:
+        """
+        The best `limit` documents for the query, best first. Fields
+        starting with the query rank first, then fields with a word starting
+        with it, then fields containing it, then near matches.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        with self._lock:
+            if len(query) < self.SHORT_QUERY:
+                candidates = {doc_id: 1.0 for doc_id in self._prefixes.get(query, ())}
+            else:
+                grams = trigrams(query)
+                hits = Counter()
+                for gram in grams:
+                    hits.update(self._postings.get(gram, ()))
+                candidates = {
+                    doc_id: count / len(grams)
+                    for doc_id, count in hits.items()
+                    if count / len(grams) >= self.MIN_OVERLAP
+                }
+
+            scored = []
+            for doc_id, overlap in candidates.items():
+                texts = self._texts[doc_id]
+                score = max(
+                    weight * self._score(texts[field], query, overlap)
+                    for field, weight in self.fields.items()
+                )
+                scored.append((score, doc_id))
+            best = heapq.nlargest(limit, scored)
+            return [self._docs[doc_id] for _, doc_id in best]
+
+    def all(self, limit: int, sort_field: Optional[str] = None) -> List[dict]:
+        """
+        The first `limit` documents, ordered by `sort_field` if given.
+        """
+        with self._lock:
+            docs = list(self._docs.values())
+        if sort_field:
+            return heapq.nsmallest(limit, docs, key=lambda doc: normalize(doc.get(sort_field)))
+        return docs[:limit]
@@ -1,30 +1,102 @@
 from collections import Counter
-from typing import List, Dict
-from nltk.corpus import stopwords
-import nltk
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from api.aws_wrappers.dynamo import get_table
+import asyncio
+import logging
 
+logger = logging.getLogger(__name__)
 
+# Per-topic post counters, one item per (time bucket, topic)
+topic_trends_table = get_table('topic_trends')
 
-def get_trending_topics(posts: List[Dict]) -> List[Dict]:
-    topic_counter = Counter()
-    for post in posts:
-        topic_counter.update(post['topics'])
-    return topic_counter.most_common()
+# Window name -> (bucket granularity, number of buckets)
+TREND_WINDOWS = {
+    "24h": ("hour", 24),
+    "7d": ("day", 7),
+    "all": ("all", 1),
+}
+
+# Hour and day buckets are only read for the 24h / 7d windows,
+# so DynamoDB's TTL removes them once they are out of range
+HOUR_BUCKET_TTL = timedelta(days=2)
+DAY_BUCKET_TTL = timedelta(days=8)
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    moment = datetime.fromisoformat(str(timestamp).replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+def hour_bucket(moment: datetime) -> str:
+    return f"hour#{moment:%Y-%m-%dT%H}"
 
-def get_trending_keywords(posts: List[Dict]) -> List[Dict]:
+def day_bucket(moment: datetime) -> str:
+    return f"day#{moment:%Y-%m-%d}"
+
+def topic_buckets(moment: datetime) -> List[Tuple[str, Optional[int]]]:
+    """
+    The buckets a post written at `moment` counts toward, each with its
+    expiry time in epoch seconds (None for the all-time bucket).
+    """
+    hour = moment.replace(minute=0, second=0, microsecond=0)
+    day = hour.replace(hour=0)
+    return [
+        (hour_bucket(hour), int((hour + HOUR_BUCKET_TTL).timestamp())),
+        (day_bucket(day), int((day + DAY_BUCKET_TTL).timestamp())),
+        ("all", None),
+    ]
+
+def window_buckets(window: str, now: Optional[datetime] = None) -> List[str]:
+    """
+    The buckets whose counts add up to a trend window ending now.
+    """
+    granularity, size = TREND_WINDOWS[window]
+    now = now or datetime.now(timezone.utc)
+    if granularity == "hour":
+        return [hour_bucket(now - timedelta(hours=i)) for i in range(size)]
+    if granularity == "day":
+        return [day_bucket(now - timedelta(days=i)) for i in range(size)]
+    return ["all"]
+
+async def record_topic_counts(timestamp: str, topics, delta: int):
+    """
+    Add `delta` to the counters of every topic in every bucket of a post's
+    timestamp. Called on post create (+1), delete (-1) and topic changes.
+    """
+    updates = []
+    for bucket, expires_at in topic_buckets(parse_timestamp(timestamp)):
+        for topic in topics:
+            update_expression = "ADD postCount :delta"
+            values = {":delta": delta}
+            if expires_at is not None:
+                update_expression += " SET expiresAt = :expiresAt"
+                values[":expiresAt"] = expires_at
+            updates.append(topic_trends_table.update_item(
+                Key={"bucket": bucket, "topic": topic},
+                UpdateExpression=update_expression,
+                ExpressionAttributeValues=values
+            ))
     try:
-        # Download stopwords if not already downloaded
-        nltk.download('stopwords', quiet=True)
-        stop_words = set(stopwords.words('english'))
-        word_counter = Counter()
-
-        for post in posts:
-            # Simple word splitting instead of word_tokenize
-            words = post['content'].lower().split()
-            filtered_words = [word for word in words if word.isalnum() and word not in stop_words]
-            word_counter.update(filtered_words)
-
-        return word_counter.most_common()
-    except Exception as e:
-        print(f"Error in keyword extraction: {str(e)}")
-        return []
\ No newline at end of file
+        await asyncio.gather(*updates)
+    except ClientError as e:
+        logger.error(f"Failed to update topic trend counters: {e}")
+
+async def get_trending_topic_counts(window: str = "all") -> List[Tuple[str, int]]:
+    """
+    Topic counts for a window, most common first, summed from the window's
+    bucket counters. Cost depends on the window and the number of distinct
+    topics, not on the number of posts.
+    """
+    bucket_items = await asyncio.gather(*(
+        topic_trends_table.query_all(KeyConditionExpression=Key("bucket").eq(bucket))
+        for bucket in window_buckets(window)
+    ))
+    topic_counter = Counter()
+    for items in bucket_items:
+        for item in items:
+            topic_counter[item["topic"]] += int(item.get("postCount", 0))
+    return [(topic, count) for topic, count in topic_counter.most_common() if count > 0]
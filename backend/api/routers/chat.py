@@ -1,5 +1,5 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
-from api.db_setup import dynamodb
+from api.aws_wrappers.dynamo import get_table
 from api.models.chat import MessageResponse, ChatRequest
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
@@ -15,8 +15,8 @@ router = APIRouter(
 )
 
 # Reference to DynamoDB tables
-chatrooms_table = dynamodb.Table('chatrooms')
-messages_table = dynamodb.Table('messages')
+chatrooms_table = get_table('chatrooms')
+messages_table = get_table('messages')
 
 class ConnectionManager:
     def __init__(self):
@@ -102,7 +102,7 @@ async def chat_endpoint(websocket: WebSocket, room_id: str, author: str):
     if room_id not in DEFAULT_ROOMS:
         # Check if room exists in the database for non-default rooms
         try:
-            response = chatrooms_table.get_item(Key={'room_id': room_id})
+            response = await chatrooms_table.get_item(Key={'room_id': room_id})
         except ClientError:
             await websocket.close()
             raise HTTPException(status_code=500, detail="Internal server error.")
@@ -127,7 +127,7 @@ async def chat_endpoint(websocket: WebSocket, room_id: str, author: str):
             }
 
             try:
-                messages_table.put_item(Item=message_item)
+                await messages_table.put_item(Item=message_item)
             except ClientError:
                 raise HTTPException(status_code=500, detail="Failed to store message.")
 
@@ -140,7 +140,7 @@ async def chat_endpoint(websocket: WebSocket, room_id: str, author: str):
 async def get_all_chat_rooms(user: str):
     try:
         # Get user's joined rooms
-        response = chatrooms_table.scan(
+        response = await chatrooms_table.scan(
             FilterExpression="contains(#users, :user)",
             ExpressionAttributeNames={"#users": "users"},
             ExpressionAttributeValues={":user": user}
@@ -158,7 +158,7 @@ async def get_all_chat_rooms(user: str):
 async def get_users_in_room(room_id: str):
     try:
         # Retrieve the item by room_id (primary key lookup)
-        response = chatrooms_table.get_item(Key={"room_id": room_id})
+        response = await chatrooms_table.get_item(Key={"room_id": room_id})
         
         # Check if the room exists
         if 'Item' not in response:
@@ -175,7 +175,7 @@ async def get_users_in_room(room_id: str):
 async def get_messages_in_room(room_id: str):
     try:
         # Query the Messages table by room_id, ordered by timestamp
-        response = messages_table.query(
+        response = await messages_table.query(
             KeyConditionExpression=Key('room_id').eq(room_id)
         )
         
@@ -194,7 +194,7 @@ async def create_chat_room(req: ChatRequest):
     }
 
     try:
-        chatrooms_table.put_item(
+        await chatrooms_table.put_item(
             Item=chatroom_item,
             ConditionExpression=Attr('room_id').not_exists()  # only if room_id does not exist
         )
@@ -211,7 +211,7 @@ async def create_chat_room(req: ChatRequest):
 async def join_chat_room(req: ChatRequest):
     try:
         # Fetch the room details
-        response = chatrooms_table.get_item(Key={'room_id': req.room_id})
+        response = await chatrooms_table.get_item(Key={'room_id': req.room_id})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="Chat room not found.")
 
@@ -227,7 +227,7 @@ async def join_chat_room(req: ChatRequest):
 
     # Update the users set in the room
     try:
-        chatrooms_table.update_item(
+        await chatrooms_table.update_item(
             Key={'room_id': req.room_id},
             UpdateExpression="ADD #u :user_set",
             ExpressionAttributeNames={
@@ -250,7 +250,7 @@ async def join_chat_room(req: ChatRequest):
         }
 
         try:
-            messages_table.put_item(Item=message_item)
+            await messages_table.put_item(Item=message_item)
         except ClientError as e:
             print(f"Error saving system message: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to save system message.")
@@ -266,7 +266,7 @@ async def join_chat_room(req: ChatRequest):
 @router.put("/leave", response_model=MessageResponse)
 async def leave_chat_room(req: ChatRequest):
     try:
-        response = chatrooms_table.get_item(Key={'room_id': req.room_id})
+        response = await chatrooms_table.get_item(Key={'room_id': req.room_id})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="Chat room not found.")
     except ClientError as e:
@@ -275,7 +275,7 @@ async def leave_chat_room(req: ChatRequest):
 
     # Remove user from the set using DELETE operation
     try:
-        chatrooms_table.update_item(
+        await chatrooms_table.update_item(
             Key={'room_id': req.room_id},
             UpdateExpression="DELETE #u :user_set",
             ExpressionAttributeNames={
@@ -298,7 +298,7 @@ async def leave_chat_room(req: ChatRequest):
         }
 
         try:
-            messages_table.put_item(Item=message_item)
+            await messages_table.put_item(Item=message_item)
         except ClientError as e:
             print(f"Error saving system message: {str(e)}")
             raise HTTPException(status_code=500, detail="Failed to save system message.")
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from api.db_setup import dynamodb
+from fastapi import APIRouter, HTTPException, Query, Response
+from api.aws_wrappers.dynamo import get_table, page_kwargs, set_next_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from api.db_setup import COMMENTS_TIME_INDEX
 from api.config import login_manager
 from api.models.comment import Comment
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
+from typing import Optional
 import logging
 
 router = APIRouter(
@@ -12,11 +14,32 @@ router = APIRouter(
 )
 
 # Reference to the comments table
-comments_table = dynamodb.Table('comments')
+comments_table = get_table('comments')
+posts_table = get_table('posts')
 
 # Used for logging
 logger = logging.getLogger(__name__)
 
+async def update_comment_count(post_id: str, delta: int):
+    """
+    Atomically add `delta` to the post's commentCount.
+    Comments on group posts have no item in the posts table, so a missing
+    post is not an error.
+    """
+    condition = "attribute_exists(postId)"
+    if delta < 0:
+        condition += " AND commentCount >= :min"
+    try:
+        await posts_table.update_item(
+            Key={'postId': post_id},
+            UpdateExpression="ADD commentCount :delta",
+            ConditionExpression=condition,
+            ExpressionAttributeValues={':delta': delta, **({':min': -delta} if delta < 0 else {})}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            logger.error(f"Failed to update comment count for post {post_id}: {e}")
+
 @router.post("/", response_model=Comment)
 async def create_comment(comment: Comment):
     """
@@ -28,29 +51,40 @@ async def create_comment(comment: Comment):
 
     try:
         # Save the comment in DynamoDB
-        comments_table.put_item(Item=comment_item)
+        await comments_table.put_item(Item=comment_item)
     except ClientError as e:
         logger.error(f"Failed to save comment to DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Failed to save comment data.")
 
+    await update_comment_count(comment.postId, 1)
     return comment
 
 
 @router.get("/{postId}", response_model=list[Comment])
-async def get_comments(postId: str):
+async def get_comments(
+    postId: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of comments to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
+):
     """
-    Retrieve all comments for a specific post.
+    Retrieve one page of comments for a specific post, oldest first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
     logger.info(f"Fetching comments for postId: {postId}")
     try:
-        response = comments_table.scan(
-            FilterExpression=Key('postId').eq(postId)
+        result = await comments_table.query(
+            IndexName=COMMENTS_TIME_INDEX,
+            KeyConditionExpression=Key('postId').eq(postId),
+            ScanIndexForward=True,
+            **page_kwargs(limit, cursor)
         )
     except ClientError as e:
         logger.error(f"Failed to query comments from DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch comments.")
 
-    items = response.get('Items', [])
+    set_next_cursor(response, result)
+    items = result.get('Items', [])
     return [Comment(**item) for item in items]
 
 @router.delete("/{commentId}", response_model=dict)
@@ -60,13 +94,17 @@ async def delete_comment(commentId: str):
     """
     logger.info(f"Deleting comment with commentId: {commentId}")
     try:
-        comments_table.delete_item(
-            Key={'commentId': commentId}
+        result = await comments_table.delete_item(
+            Key={'commentId': commentId},
+            ReturnValues='ALL_OLD'
         )
     except ClientError as e:
         logger.error(f"Failed to delete comment from DynamoDB: {e}")
-        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
-            raise HTTPException(status_code=404, detail="Comment not found.")
         raise HTTPException(status_code=500, detail="Failed to delete comment.")
 
+    deleted = result.get('Attributes')
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Comment not found.")
+
+    await update_comment_count(deleted['postId'], -1)
     return {"message": "Comment deleted successfully!"}
@@ -5,11 +5,11 @@ import stripe
 import os
 from datetime import datetime
 import uuid
-import boto3
 from botocore.exceptions import ClientError
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from decimal import Decimal
+from api.aws_wrappers.dynamo import get_table
 
 router = APIRouter(
     prefix="/donations",
@@ -22,15 +22,7 @@ stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
 
 stripe.webhook_secret = os.getenv("VITE_STRIPE_WEBHOOK_SECRET")
 
-# Configure DynamoDB
-dynamodb = boto3.resource(
-    'dynamodb',
-    aws_access_key_id=os.getenv('aws_access_key_id'),
-    aws_secret_access_key=os.getenv('aws_secret_access_key'),
-    region_name=os.getenv('aws_region')
-)
-
-donation_table = dynamodb.Table('donations')
+donation_table = get_table('donations')
 
 class PaymentIntentRequest(BaseModel):
     amount: float
@@ -119,7 +111,7 @@ async def stripe_webhook(request: Request):
             
             # Update donation status in DynamoDB
             try:
-                donations = donation_table.query(
+                donations = await donation_table.query(
                     IndexName='payment_intent_id-index',
                     KeyConditionExpression='payment_intent_id = :pid',
                     ExpressionAttributeValues={
@@ -129,7 +121,7 @@ async def stripe_webhook(request: Request):
 
                 if donations.get('Items'):
                     donation = donations['Items'][0]
-                    donation_table.update_item(
+                    await donation_table.update_item(
                         Key={'id': donation['id']},
                         UpdateExpression='SET #status = :status, updated_at = :updated_at',
                         ExpressionAttributeNames={
@@ -161,7 +153,7 @@ async def stripe_webhook(request: Request):
 @router.get("/", response_model=List[DonationResponse])
 async def get_donations():
     try:
-        response = donation_table.scan()
+        response = await donation_table.scan()
         return [item for item in response.get('Items', [])]
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
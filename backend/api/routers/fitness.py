@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
 import boto3
 from boto3.dynamodb.conditions import Key
-from api.db_setup import dynamodb
+from api.aws_wrappers.dynamo import get_table
 from pydantic import BaseModel
 import uuid
 from api.configa.default_tasks import DEFAULT_TASKS
@@ -11,7 +11,7 @@ router = APIRouter(
     tags=["fitness"]
 )
 
-table = dynamodb.Table('fitness_tasks')
+table = get_table('fitness_tasks')
 
 class TaskCreate(BaseModel):
     description: str
@@ -31,10 +31,10 @@ async def create_default_tasks_for_user(username: str):
                 'category': task_template.get('category', 'general'),
                 'is_finished': False
             }
-            
-            table.put_item(Item=task_item)
             tasks_created.append(task_item)
-            
+
+        # 25 tasks per request instead of one request per task
+        await table.batch_write(put_items=tasks_created)
         return tasks_created
         
     except Exception as e:
@@ -46,7 +46,7 @@ async def create_default_tasks_for_user(username: str):
 async def get_fitness_tasks(username: str):
     print(f"Getting fitness tasks for {username}")
     try:
-        response = table.query(
+        response = await table.query(
             KeyConditionExpression=Key('username').eq(username)
         )
         return response['Items']
@@ -58,14 +58,14 @@ async def check_fitness_task(username: str, task_id: str):
     print(f"Checking fitness task {task_id} for {username}")
 
     try:
-        response = table.query( KeyConditionExpression=Key('username').eq(username))
+        response = await table.query( KeyConditionExpression=Key('username').eq(username))
         if 'Items' not in response:
             raise HTTPException(status_code=404, detail="Task not found")
         
         task = next((item for item in response['Items'] if item['task_id'] == task_id), None)
         current_task = task['is_finished']
 
-        response = table.update_item(
+        response = await table.update_item(
             Key={'username': username, 'task_id': task_id},
             UpdateExpression='SET is_finished = :is_finished',
             ExpressionAttributeValues={':is_finished': not current_task},
@@ -79,7 +79,7 @@ async def check_fitness_task(username: str, task_id: str):
 async def create_fitness_task(username: str, task: TaskCreate):
     try:
         task_id = str(uuid.uuid4())
-        response = table.put_item(
+        response = await table.put_item(
             Item={
                 'username': username,
                 'task_id': task_id,
@@ -100,7 +100,7 @@ async def create_fitness_task(username: str, task: TaskCreate):
 async def delete_fitness_task(username: str, task_id: str):
     try:
         # Delete the item
-        response = table.delete_item(
+        response = await table.delete_item(
             Key={
                 'username': username,
                 'task_id': task_id
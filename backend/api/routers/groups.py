@@ -1,7 +1,8 @@
 from api.aws_wrappers.images import upload_image
-from fastapi import APIRouter, HTTPException, Query, Form, File, UploadFile
-from api.db_setup import dynamodb
-from api.models.group import Group
+from fastapi import APIRouter, HTTPException, Query, Form, File, UploadFile, Response
+from api.aws_wrappers.dynamo import get_table, transact_write, cancellation_reasons, page_kwargs, set_next_cursor, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from api.db_setup import GROUP_POSTS_TIME_INDEX, group_post_item
+from api.models.group import Group, GroupPost, GroupSummary
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from typing import List, Optional
@@ -11,8 +12,11 @@ from dotenv import load_dotenv
 from os import getenv
 from api.routers.posts import update_post, get_post
 from api.models.post import Post, LikeRequest  # Ensure Post model is correctly imported
+from api.models.timestamps import format_timestamp, sortable_timestamp
+from api.nlp.trends import parse_timestamp
+from api.nlp.search_index import TrigramIndex
+import asyncio
 import uuid
-from datetime import datetime
 
 router = APIRouter(
     prefix="/groups",
@@ -20,7 +24,12 @@ router = APIRouter(
 )
 
 # Reference to the groups table
-groups_table = dynamodb.Table("groups")
+groups_table = get_table("groups")
+# Group posts, one item each under the group's partition key
+group_posts_table = get_table("group_posts")
+
+# Attempts at a group write while the group keeps changing underneath it
+GROUP_WRITE_ATTEMPTS = 3
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,6 +38,10 @@ load_dotenv()
 logger = logging.getLogger("groups")
 logger.setLevel(logging.INFO)
 
+# Rebuild interval of the group search index, so every worker also sees
+# groups created or changed by the others
+GROUP_SEARCH_REFRESH_SECONDS = int(getenv("GROUP_SEARCH_REFRESH_SECONDS", "300"))
+
 
 # Unsplash API configuration
 BASE_URL = "https://api.unsplash.com/search/photos"
@@ -56,6 +69,146 @@ def fetch_image_url(query: str) -> str:
             status_code=response.status_code, detail="Failed to fetch image from Unsplash"
         )
 
+
+# Fields returned by the group directory and search; embedded posts are never
+# read, so postCount is only right for groups moved by migrate_group_posts
+GROUP_SUMMARY_FIELDS = ["groupId", "name", "description", "author", "image", "postCount"]
+GROUP_SUMMARY_SCAN = {
+    "ProjectionExpression": ", ".join(f"#{field}" for field in GROUP_SUMMARY_FIELDS),
+    "ExpressionAttributeNames": {f"#{field}": field for field in GROUP_SUMMARY_FIELDS},
+}
+
+# Group summaries searchable by name and description, kept in memory
+group_search_index = TrigramIndex({"name": 2.0, "description": 1.0})
+
+def index_group(group: dict):
+    summary = {field: group[field] for field in GROUP_SUMMARY_FIELDS if field in group}
+    if "posts" in group:
+        summary["postCount"] = len(group["posts"])
+    group_search_index.add(group["groupId"], summary)
+
+def count_indexed_post(group_id: str, delta: int):
+    summary = group_search_index.get(group_id)
+    if summary is not None:
+        group_search_index.add(group_id, {**summary, "postCount": int(summary.get("postCount", 0)) + delta})
+
+async def warm_group_search_index():
+    """
+    Rebuild the group search index from the groups table and swap it in.
+    """
+    groups = []
+    kwargs = {}
+    try:
+        while True:
+            result = await groups_table.scan(**GROUP_SUMMARY_SCAN, **kwargs)
+            groups.extend(result.get("Items", []))
+            if "LastEvaluatedKey" not in result:
+                break
+            kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+    except ClientError as e:
+        logger.error(f"Failed to load groups for the search index: {e}")
+        return
+    group_search_index.replace_all(
+        (group["groupId"], {field: group[field] for field in GROUP_SUMMARY_FIELDS if field in group})
+        for group in groups
+    )
+    logger.info(f"Group search index built from {len(groups)} groups")
+
+async def refresh_group_search_index():
+    while True:
+        await asyncio.sleep(GROUP_SEARCH_REFRESH_SECONDS)
+        await warm_group_search_index()
+
+
+# Groups created before group_posts existed keep their posts in a "posts"
+# list on the group item. Reads handle both layouts; a group's list is moved
+# to group_posts the first time a post is added to it.
+
+def with_post_count(group: dict) -> dict:
+    if "posts" in group:
+        group["postCount"] = len(group["posts"])
+    return group
+
+async def move_embedded_posts(group_id: str):
+    """
+    Move the posts list embedded in a group item into group_posts and
+    replace it with postCount. Does nothing for groups already moved.
+    """
+    moved_ids = set()
+    for _ in range(GROUP_WRITE_ATTEMPTS):
+        response = await groups_table.get_item(Key={"groupId": group_id}, ProjectionExpression="posts")
+        posts = response.get("Item", {}).get("posts")
+        if posts is None:
+            return
+
+        items = {post["postId"]: group_post_item(group_id, post) for post in posts}
+        await group_posts_table.batch_write(
+            put_items=items.values(),
+            # Posts deleted from the list since the previous attempt
+            delete_keys=[{"groupId": group_id, "postId": post_id} for post_id in moved_ids - items.keys()]
+        )
+        moved_ids = set(items)
+        try:
+            await groups_table.update_item(
+                Key={"groupId": group_id},
+                UpdateExpression="SET postCount = :count REMOVE posts",
+                ConditionExpression="posts = :old",
+                ExpressionAttributeValues={":old": posts, ":count": len(items)}
+            )
+            logger.info(f"Moved {len(items)} embedded posts of group {group_id} to group_posts")
+            return
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+    raise HTTPException(status_code=409, detail="Group posts changed concurrently, please retry")
+
+def embedded_posts_page(group_id: str, posts: List[dict], limit: int, cursor: Optional[str]):
+    """
+    One page of a group's embedded posts, newest first, with the same cursor
+    format as a group_posts index query.
+    """
+    items = sorted(
+        (group_post_item(group_id, post) for post in posts),
+        key=lambda item: (item["timestamp"], item["postId"]),
+        reverse=True
+    )
+    start = decode_cursor(cursor)
+    if start:
+        position = (start.get("timestamp", ""), start.get("postId", ""))
+        items = [item for item in items if (item["timestamp"], item["postId"]) < position]
+    page = items[:limit]
+    next_cursor = None
+    if len(items) > limit:
+        next_cursor = encode_cursor({key: page[-1][key] for key in ("groupId", "postId", "timestamp")})
+    return page, next_cursor
+
+async def group_posts_page(group: dict, limit: int, cursor: Optional[str]):
+    """
+    One page of a group's posts, newest first, and the cursor for the next page.
+    """
+    if "posts" in group:
+        return embedded_posts_page(group["groupId"], group["posts"], limit, cursor)
+    result = await group_posts_table.query(
+        IndexName=GROUP_POSTS_TIME_INDEX,
+        KeyConditionExpression=Key("groupId").eq(group["groupId"]),
+        ScanIndexForward=False,
+        **page_kwargs(limit, cursor)
+    )
+    return result.get("Items", []), encode_cursor(result.get("LastEvaluatedKey"))
+
+async def delete_all_group_posts(group_id: str):
+    kwargs = {}
+    while True:
+        result = await group_posts_table.query(
+            KeyConditionExpression=Key("groupId").eq(group_id),
+            ProjectionExpression="groupId, postId",
+            **kwargs
+        )
+        await group_posts_table.batch_write(delete_keys=result.get("Items", []))
+        if "LastEvaluatedKey" not in result:
+            break
+        kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+
 # Post: create a group
 @router.post("/", response_model=Group, status_code=201)
 async def create_group(
@@ -72,7 +225,7 @@ async def create_group(
             "name": name,
             "description": description,
             "author": author,
-            "posts": []
+            "postCount": 0
         }
         print("group_data:", group_data)
         # Fetch image URL from Unsplash based on the group's name
@@ -86,7 +239,8 @@ async def create_group(
         group_data["image"] = image_url  # Set the image URL
 
         # Store the group in DynamoDB
-        groups_table.put_item(Item=group_data)
+        await groups_table.put_item(Item=group_data)
+        index_group(group_data)
         logger.info(f"Group created: {group_data}")
         return Group(**group_data)
     except ClientError as e:
@@ -94,7 +248,7 @@ async def create_group(
         raise HTTPException(status_code=500, detail="Failed to create group")
 
 # Post: add post to a group
-@router.post("/{group_id}/posts", response_model=Post)
+@router.post("/{group_id}/posts", response_model=GroupPost)
 async def add_post_to_group(
     group_id: str,
     author: str = Form(...),
@@ -105,6 +259,11 @@ async def add_post_to_group(
     likes: int = Form(0),
     createdAt: str = Form(None)
 ):
+    try:
+        timestamp = format_timestamp(parse_timestamp(createdAt)) if createdAt else sortable_timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid createdAt timestamp")
+
     try:
         # Upload images to S3
         image_urls = []
@@ -114,91 +273,146 @@ async def add_post_to_group(
                 image_urls.append(url)
         
         # Create post object
-        post = Post(
+        post = GroupPost(
+            groupId=group_id,
             postId=postId or str(uuid.uuid4()),
             author=author,
             content=content,
             topics=set(topics),
             images=set(image_urls) if image_urls else {"none"},
             likes=likes,
-            likedBy=[],
-            timestamp=createdAt or str(datetime.now())
-        )
-        
-        # Query the group from DynamoDB
-        response = groups_table.get_item(Key={"groupId": group_id})
-        group = response.get("Item")
-        
-        if not group:
-            raise HTTPException(status_code=404, detail="Group not found")
-
-        # Ensure the "posts" key exists
-        posts = group.get("posts", [])
-        
-        # Add the new post
-        posts.append(post.dict())
-        
-        # Update the group in DynamoDB
-        groups_table.update_item(
-            Key={"groupId": group_id},
-            UpdateExpression="SET posts = :posts",
-            ExpressionAttributeValues={":posts": posts}
+            timestamp=timestamp
         )
+        # likedBy is a string set that exists once the post has likes
+        post_item = post.dict(exclude={"likedBy", "isLiked"})
 
-        return post
+        # Store the post and count it on the group in one transaction
+        for _ in range(GROUP_WRITE_ATTEMPTS):
+            try:
+                await transact_write([
+                    {"Put": {
+                        "TableName": group_posts_table.name,
+                        "Item": post_item,
+                        "ConditionExpression": "attribute_not_exists(postId)"
+                    }},
+                    {"Update": {
+                        "TableName": groups_table.name,
+                        "Key": {"groupId": group_id},
+                        "UpdateExpression": "ADD postCount :one",
+                        "ConditionExpression": "attribute_exists(groupId) AND attribute_not_exists(posts)",
+                        "ExpressionAttributeValues": {":one": 1}
+                    }}
+                ])
+                count_indexed_post(group_id, 1)
+                return post
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "TransactionCanceledException":
+                    raise
+                post_reason, group_reason = cancellation_reasons(e, 2)
+                if post_reason == "ConditionalCheckFailed":
+                    raise HTTPException(status_code=409, detail="Post already exists")
+                if group_reason != "ConditionalCheckFailed":
+                    raise
+                response = await groups_table.get_item(Key={"groupId": group_id}, ProjectionExpression="groupId")
+                if "Item" not in response:
+                    raise HTTPException(status_code=404, detail="Group not found")
+                # Still has an embedded posts list
+                await move_embedded_posts(group_id)
+
+        raise HTTPException(status_code=409, detail="Group changed concurrently, please retry")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error adding post to group {group_id}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to add post: {str(e)}")
 
+# Get one page of a group's posts
+@router.get("/{group_id}/posts", response_model=List[GroupPost])
+async def get_group_posts(
+    group_id: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
+):
+    """
+    Fetch one page of a group's posts, newest first.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    try:
+        group_response = await groups_table.get_item(Key={"groupId": group_id}, ProjectionExpression="groupId, posts")
+        if "Item" not in group_response:
+            raise HTTPException(status_code=404, detail="Group not found")
+        posts, next_cursor = await group_posts_page(group_response["Item"], limit, cursor)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return [GroupPost(**post) for post in posts]
+    except ClientError as e:
+        logger.error(e.response["Error"]["Message"])
+        raise HTTPException(status_code=500, detail="Failed to get group posts")
+
 # Get a group by ID
 @router.get("/{group_id}", response_model=Group)
-def get_group(group_id: str):
+async def get_group(group_id: str):
+    """
+    Fetch a group with its newest posts (at most MAX_PAGE_SIZE; page through
+    the rest with GET /groups/{group_id}/posts).
+    """
     try:
-        response = groups_table.get_item(Key={"groupId": group_id})
+        response = await groups_table.get_item(Key={"groupId": group_id})
         if "Item" not in response:
             raise HTTPException(status_code=404, detail="Group not found")
-        return Group(**response["Item"])
+        group = with_post_count(response["Item"])
+        group["posts"], _ = await group_posts_page(group, MAX_PAGE_SIZE, None)
+        return Group(**group)
     except ClientError as e:
         logger.error(e.response["Error"]["Message"])
         raise HTTPException(status_code=500, detail="Failed to get group")
 
-
 # Get all groups
-@router.get("/", response_model=List[Group])
-def list_groups():
+@router.get("/", response_model=List[GroupSummary])
+async def list_groups(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of groups to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
+):
+    """
+    Fetch one page of the group directory: summary fields only, without
+    posts (see GET /groups/{group_id}/posts).
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
     try:
-        response = groups_table.scan()
-        groups = response.get("Items", [])
-        return [Group(**group) for group in groups]
+        result = await groups_table.scan(**GROUP_SUMMARY_SCAN, **page_kwargs(limit, cursor))
+        set_next_cursor(response, result)
+        return [GroupSummary(**group) for group in result.get("Items", [])]
     except ClientError as e:
         logger.error(e.response["Error"]["Message"])
         raise HTTPException(status_code=500, detail="Failed to list groups")
 
 
 # Search for a group
-@router.get("/search/", response_model=List[Group])
-def search_groups(query: Optional[str] = Query(None, description="Search query for group names or descriptions")):
-    try:
-        response = groups_table.scan()
-        groups = response.get("Items", [])
-        if query:
-            query_lower = query.lower()
-            groups = [
-                group for group in groups
-                if query_lower in group["name"].lower() or query_lower in group["description"].lower()
-            ]
-        return [Group(**group) for group in groups]
-    except ClientError as e:
-        logger.error(e.response["Error"]["Message"])
-        raise HTTPException(status_code=500, detail="Failed to search groups")
+@router.get("/search/", response_model=List[GroupSummary])
+async def search_groups(
+    query: Optional[str] = Query(None, description="Search query for group names or descriptions"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of groups to return")
+):
+    """
+    Search groups by name and description from the in-memory index: best
+    matches first (name before description, prefix before substring, then
+    near matches). Without a query, groups are listed by name.
+    """
+    if query:
+        groups = group_search_index.search(query, limit)
+    else:
+        groups = group_search_index.all(limit, "name")
+    return [GroupSummary(**group) for group in groups]
 
 
 # Update a group, including updating posts within the group
 @router.put("/{group_id}", response_model=Group)
-def update_group(group_id: str, group: Group):
+async def update_group(group_id: str, group: Group):
     try:
         # Check if the group exists
-        existing_group_response = groups_table.get_item(Key={"groupId": group_id})
+        existing_group_response = await groups_table.get_item(Key={"groupId": group_id})
         if "Item" not in existing_group_response:
             raise HTTPException(status_code=404, detail="Group not found")
 
@@ -220,9 +434,19 @@ def update_group(group_id: str, group: Group):
                 updated_post = update_post(post.postId, post)
                 logger.info(f"Post updated: {updated_post}")
 
-        # Update the group
-        group_dict = group.dict()
-        groups_table.put_item(Item=group_dict)
+        # Update the group's own fields; posts and postCount are maintained
+        # by the post endpoints (groups that still embed posts keep the list)
+        group_dict = group.dict(exclude={"groupId", "postCount", "posts"})
+        if "posts" in existing_group_response["Item"]:
+            group_dict["posts"] = [post.dict(exclude={"groupId", "isLiked"}) for post in group.posts]
+        update_response = await groups_table.update_item(
+            Key={"groupId": group_id},
+            UpdateExpression="SET " + ", ".join(f"#{field} = :{field}" for field in group_dict),
+            ExpressionAttributeNames={f"#{field}": field for field in group_dict},
+            ExpressionAttributeValues={f":{field}": value for field, value in group_dict.items()},
+            ReturnValues="ALL_NEW"
+        )
+        index_group(update_response["Attributes"])
         logger.info(f"Group updated: {group_dict}")
         return group
     except ClientError as e:
@@ -233,79 +457,107 @@ def update_group(group_id: str, group: Group):
         raise he
 
 # Update a group's post
-@router.put("/{group_id}/posts/{post_id}", response_model=Post)
-def update_group_post(group_id: str, post_id: str, post_update: Post):
+@router.put("/{group_id}/posts/{post_id}", response_model=GroupPost)
+async def update_group_post(group_id: str, post_id: str, post_update: Post):
     try:
-        # Check if the group exists
-        group = groups_table.get(group_id)
-        if not group:
-            raise HTTPException(status_code=404, detail="Group not found")
-
-        # Check if the post exists in the group
-        group_posts = group.get("posts", [])
-        existing_post = next((p for p in group_posts if p["postId"] == post_id), None)
-        if not existing_post:
+        await move_embedded_posts(group_id)
+
+        # Only the post's own content can be edited; likes have their own endpoint
+        response = await group_posts_table.update_item(
+            Key={"groupId": group_id, "postId": post_id},
+            UpdateExpression="SET content = :content, topics = :topics, images = :images",
+            ConditionExpression="attribute_exists(postId)",
+            ExpressionAttributeValues={
+                ":content": post_update.content,
+                ":topics": post_update.topics or {"general"},
+                ":images": post_update.images or {"none"}
+            },
+            ReturnValues="ALL_NEW"
+        )
+        updated_post = GroupPost(**response["Attributes"])
+        logger.info(f"Post updated in group {group_id}: {updated_post}")
+        return updated_post
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
             raise HTTPException(status_code=404, detail="Post not found in the group")
-
-        # Update the post fields
-        updated_post = {**existing_post, **post_update.dict()}
-        updated_post_instance = Post(**updated_post)
-
-        # Update the post in the database
-        update_post(post_id, updated_post_instance)
-
-        # Update the group's post list
-        updated_group_posts = [
-            updated_post_instance.dict() if p["postId"] == post_id else p for p in group_posts
-        ]
-        groups_table[group_id]["posts"] = updated_group_posts
-
-        logger.info(f"Post updated in group {group_id}: {updated_post_instance.dict()}")
-        return updated_post_instance
-    except Exception as e:
         logger.error(f"Error updating post in group {group_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to update post in group")
 
-# Delete a post from a group
-@router.delete("/{group_id}/posts/{post_id}", status_code=200)
-def delete_group_post(group_id: str, post_id: str):
+async def find_embedded_post(group_id: str, post_id: str):
+    """
+    The position and content of a post in a group's embedded posts list.
+    """
+    response = await groups_table.get_item(Key={"groupId": group_id}, ProjectionExpression="posts")
+    if "Item" not in response:
+        raise HTTPException(status_code=404, detail="Group not found")
+    posts = response["Item"].get("posts", [])
+    post_index = next((i for i, p in enumerate(posts) if p["postId"] == post_id), None)
+    if post_index is None:
+        raise HTTPException(status_code=404, detail="Post not found in group")
+    return post_index, posts[post_index]
+
+async def delete_embedded_post(group_id: str, post_id: str):
+    """
+    Delete a post from a group that still embeds its posts list. Only the
+    post's list element is removed; the condition on its postId retries the
+    lookup if the list changed in between.
+    """
     try:
-        # Get the group
-        response = groups_table.get_item(Key={"groupId": group_id})
-        if "Item" not in response:
-            raise HTTPException(status_code=404, detail="Group not found")
-        
-        group = response["Item"]
-        posts = group.get("posts", [])
-        
-        # Check if post exists in the group
-        post_index = next((i for i, p in enumerate(posts) if p["postId"] == post_id), None)
-        if post_index is None:
-            raise HTTPException(status_code=404, detail="Post not found in group")
-        
-        # Remove the post
-        deleted_post = posts.pop(post_index)
-        
-        # Update the group in DynamoDB
-        try:
-            update_response = groups_table.update_item(
-                Key={"groupId": group_id},
-                UpdateExpression="SET posts = :posts",
-                ExpressionAttributeValues={":posts": posts},
-                ReturnValues="ALL_NEW"
-            )
-            logger.info(f"Post {post_id} deleted from group {group_id}")
-        except ClientError as e:
-            logger.error(f"DynamoDB update error: {e.response['Error']['Message']}")
-            raise HTTPException(status_code=500, detail="Database update failed")
-        
-        return {"message": "Post deleted successfully", "postId": post_id}
+        for _ in range(GROUP_WRITE_ATTEMPTS):
+            post_index, _ = await find_embedded_post(group_id, post_id)
+            try:
+                await groups_table.update_item(
+                    Key={"groupId": group_id},
+                    UpdateExpression=f"REMOVE posts[{post_index}]",
+                    ConditionExpression=f"posts[{post_index}].postId = :postId",
+                    ExpressionAttributeValues={":postId": post_id}
+                )
+                count_indexed_post(group_id, -1)
+                logger.info(f"Post {post_id} deleted from group {group_id}")
+                return {"message": "Post deleted successfully", "postId": post_id}
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    logger.error(f"DynamoDB update error: {e.response['Error']['Message']}")
+                    raise HTTPException(status_code=500, detail="Database update failed")
+
+        raise HTTPException(status_code=409, detail="Group posts changed concurrently, please retry")
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error deleting post from group: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete post: {str(e)}")
 
+# Delete a post from a group
+@router.delete("/{group_id}/posts/{post_id}", status_code=200)
+async def delete_group_post(group_id: str, post_id: str):
+    try:
+        await transact_write([
+            {"Delete": {
+                "TableName": group_posts_table.name,
+                "Key": {"groupId": group_id, "postId": post_id},
+                "ConditionExpression": "attribute_exists(postId)"
+            }},
+            {"Update": {
+                "TableName": groups_table.name,
+                "Key": {"groupId": group_id},
+                "UpdateExpression": "ADD postCount :minus_one",
+                "ConditionExpression": "attribute_exists(groupId)",
+                "ExpressionAttributeValues": {":minus_one": -1}
+            }}
+        ])
+        count_indexed_post(group_id, -1)
+        logger.info(f"Post {post_id} deleted from group {group_id}")
+        return {"message": "Post deleted successfully", "postId": post_id}
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "TransactionCanceledException":
+            logger.error(f"DynamoDB delete error: {e.response['Error']['Message']}")
+            raise HTTPException(status_code=500, detail="Database update failed")
+        post_reason, group_reason = cancellation_reasons(e, 2)
+        if post_reason == "ConditionalCheckFailed":
+            # Not in group_posts: the group may still embed its posts
+            return await delete_embedded_post(group_id, post_id)
+        raise HTTPException(status_code=404, detail="Group not found")
+
 @router.put("/{group_id}/update-info")
 async def update_group_info(
     group_id: str,
@@ -316,7 +568,7 @@ async def update_group_info(
     try:
         # Get existing group with proper error handling
         try:
-            response = groups_table.get_item(Key={"groupId": group_id})
+            response = await groups_table.get_item(Key={"groupId": group_id})
             existing_group = response.get("Item")
         except ClientError as e:
             logger.error(f"DynamoDB get_item error: {e.response['Error']['Message']}")
@@ -336,7 +588,7 @@ async def update_group_info(
 
         # Update database with transaction safety
         try:
-            update_response = groups_table.update_item(
+            update_response = await groups_table.update_item(
                 Key={"groupId": group_id},
                 UpdateExpression="SET #name = :name, #description = :desc, #image = :img",
                 ExpressionAttributeNames={
@@ -352,6 +604,7 @@ async def update_group_info(
                 ReturnValues="ALL_NEW"
             )
             updated_group = update_response.get("Attributes", {})
+            index_group(updated_group)
         except ClientError as e:
             logger.error(f"DynamoDB update error: {e.response['Error']['Message']}")
             raise HTTPException(status_code=500, detail="Database update failed")
@@ -371,90 +624,139 @@ async def update_group_info(
 
 # Delete a group
 @router.delete("/{group_id}", status_code=204)
-def delete_group(group_id: str):
+async def delete_group(group_id: str):
     try:
-        groups_table.delete_item(Key={"groupId": group_id})
+        await groups_table.delete_item(Key={"groupId": group_id})
+        await delete_all_group_posts(group_id)
+        group_search_index.remove(group_id)
         logger.info(f"Group deleted: {group_id}")
         return {"message": "Group deleted successfully"}
     except ClientError as e:
         logger.error(e.response["Error"]["Message"])
         raise HTTPException(status_code=500, detail="Failed to delete group")
 
+async def set_group_post_like(group_id: str, post_id: str, username: str, liked: bool) -> dict:
+    """
+    Add or remove one like on a group post in a single conditional update of
+    its likedBy string set and likes counter. The condition fails if the post
+    is already in the requested state.
+    """
+    if liked:
+        update_expression = "ADD likedBy :likers, likes :delta"
+        condition = "attribute_exists(postId) AND NOT contains(likedBy, :username)"
+    else:
+        update_expression = "DELETE likedBy :likers ADD likes :delta"
+        condition = "contains(likedBy, :username)"
+    response = await group_posts_table.update_item(
+        Key={"groupId": group_id, "postId": post_id},
+        UpdateExpression=update_expression,
+        ConditionExpression=condition,
+        ExpressionAttributeValues={
+            ":likers": {username},
+            ":username": username,
+            ":delta": 1 if liked else -1
+        },
+        ReturnValues="UPDATED_NEW"
+    )
+    return {
+        "success": True,
+        "likes": int(response.get("Attributes", {}).get("likes", 0)),
+        "isLiked": liked
+    }
+
 # Add this endpoint to handle likes for posts within groups
 @router.post("/{group_id}/posts/{post_id}/like", status_code=200)
-def like_group_post(group_id: str, post_id: str, like_request: LikeRequest):
+async def like_group_post(group_id: str, post_id: str, like_request: LikeRequest):
+    username = like_request.username
+    logger.info(f"Like request received for post {post_id} in group {group_id} from user {username}")
     try:
-        # Log incoming request
-        logger.info(f"Like request received for post {post_id} in group {group_id} from user {like_request.username}")
-        
-        # Check if the group exists
-        group_response = groups_table.get_item(Key={"groupId": group_id})
-        if "Item" not in group_response:
-            raise HTTPException(status_code=404, detail="Group not found")
-        
-        group = group_response["Item"]
-        
-        # Find the post in the group
-        posts = group.get("posts", [])
-        post_index = next((i for i, p in enumerate(posts) if p["postId"] == post_id), None)
-        
-        if post_index is None:
-            raise HTTPException(status_code=404, detail="Post not found in group")
-        
-        # Get the post
-        post = posts[post_index]
-        username = like_request.username
-        
-        # Initialize likedBy array if it doesn't exist
-        if "likedBy" not in post:
-            post["likedBy"] = []
-        
-        liked_by = post.get("likedBy", [])
-        current_likes = post.get("likes", 0)
-        
-        logger.info(f"Current state - likes: {current_likes}, likedBy: {liked_by}")
-        
-        # Toggle like status
-        if username in liked_by:
-            # Unlike the post
-            liked_by.remove(username)
-            current_likes = max(0, current_likes - 1)  # Ensure likes don't go below 0
-            logger.info(f"Removing like from user {username}")
-        else:
-            # Like the post
-            if username not in liked_by:  # Extra check to ensure no duplicate likes
-                liked_by.append(username)
-                current_likes += 1
-                logger.info(f"Adding like from user {username}")
-        
-        # Update post with new like information
-        post["likedBy"] = liked_by
-        post["likes"] = current_likes
-        
-        # Update the post in the group
-        posts[post_index] = post
-        
-        # Update the group in DynamoDB
-        try:
-            update_response = groups_table.update_item(
-                Key={"groupId": group_id},
-                UpdateExpression="SET posts = :posts",
-                ExpressionAttributeValues={":posts": posts},
-                ReturnValues="ALL_NEW"
+        for _ in range(GROUP_WRITE_ATTEMPTS):
+            # Try to like; if already liked, unlike instead
+            for liked in (True, False):
+                try:
+                    return await set_group_post_like(group_id, post_id, username, liked)
+                except ClientError as e:
+                    if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+            response = await group_posts_table.get_item(
+                Key={"groupId": group_id, "postId": post_id},
+                ProjectionExpression="postId"
             )
-            logger.info(f"DynamoDB update response: {update_response}")
-        except ClientError as e:
-            logger.error(f"DynamoDB update_item error: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to update like status in database")
-        
-        result = {
-            "success": True,
-            "likes": current_likes,
-            "isLiked": username in liked_by
-        }
-        logger.info(f"Returning result: {result}")
-        return result
-        
+            if "Item" not in response:
+                # Not in group_posts: the group may still embed its posts
+                return await like_embedded_post(group_id, post_id, like_request)
+
+        raise HTTPException(status_code=409, detail="Like status changed concurrently, please retry")
+    except HTTPException as he:
+        raise he
+    except ClientError as e:
+        logger.error(f"DynamoDB update_item error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update like status in database")
+
+async def like_embedded_post(group_id: str, post_id: str, like_request: LikeRequest):
+    """
+    Toggle a like on a post of a group that still embeds its posts list.
+    The update addresses only that post's likes and likedBy by list index,
+    guarded by a condition on the post's postId (and on the liker's entry
+    when unliking); if the list was reordered meanwhile, the post is looked
+    up again and the update retried.
+    """
+    username = like_request.username
+    try:
+        for _ in range(GROUP_WRITE_ATTEMPTS):
+            post_index, post = await find_embedded_post(group_id, post_id)
+            path = f"posts[{post_index}]"
+            liked_by = list(post.get("likedBy", []))
+            values = {":postId": post_id, ":one": 1}
+
+            if username in liked_by:
+                # Unlike the post
+                # Legacy posts may have likedBy without a likes counter
+                liker_index = liked_by.index(username)
+                update_expression = (
+                    f"REMOVE {path}.likedBy[{liker_index}] "
+                    f"SET {path}.likes = if_not_exists({path}.likes, :likers_count) - :one"
+                )
+                condition = f"{path}.postId = :postId AND {path}.likedBy[{liker_index}] = :username"
+                values.update({":likers_count": len(liked_by), ":username": username})
+            else:
+                # Like the post
+                update_expression = (
+                    f"SET {path}.likes = if_not_exists({path}.likes, :zero) + :one, "
+                    f"{path}.likedBy = list_append(if_not_exists({path}.likedBy, :empty), :likers)"
+                )
+                condition = f"{path}.postId = :postId AND NOT contains({path}.likedBy, :username)"
+                values.update({":zero": 0, ":empty": [], ":likers": [username], ":username": username})
+
+            try:
+                response = await groups_table.update_item(
+                    Key={"groupId": group_id},
+                    UpdateExpression=update_expression,
+                    ConditionExpression=condition,
+                    ExpressionAttributeValues=values,
+                    ReturnValues="UPDATED_NEW"
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+                continue
+
+            # UPDATED_NEW holds the updated element of the posts list (with
+            # only the updated fields), so match on postId only when present
+            updated_posts = response.get("Attributes", {}).get("posts", [])
+            updated_post = next(
+                (p for p in updated_posts if p.get("postId", post_id) == post_id and "likes" in p),
+                {}
+            )
+            result = {
+                "success": True,
+                "likes": int(updated_post.get("likes", 0)),
+                "isLiked": username not in liked_by
+            }
+            logger.info(f"Returning result: {result}")
+            return result
+
+        raise HTTPException(status_code=409, detail="Like status changed concurrently, please retry")
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Form, HTTPException, UploadFile, File, Depends, Query
-from api.db_setup import dynamodb
+from fastapi import APIRouter, Form, HTTPException, UploadFile, File, Depends, Query, Response
+from api.aws_wrappers.dynamo import get_table, batch_get, transact_write, cancellation_reasons, page_kwargs, set_next_cursor, encode_cursor, decode_cursor, NEXT_CURSOR_HEADER, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from api.db_setup import FEED_INDEX, FEED_KEY, FEED_PARTITION, POSTS_AUTHOR_INDEX, COMMENTS_TIME_INDEX
 from api.config import login_manager
-from api.models.post import Post, UpdatePostModel, LikeRequest
+from api.models.post import Post, FeedPost, UpdatePostModel, LikeRequest
+from api.models.timestamps import sortable_timestamp
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
-from typing import List, Set
+from typing import List, Optional, Set
+import asyncio
+import heapq
 import logging
-from api.nlp.trends import get_trending_keywords, get_trending_topics
+from api.nlp.trends import get_trending_topic_counts, record_topic_counts
+from api.nlp import keywords
 from api.aws_wrappers.images import upload_image, delete_image
 from api.auth_utils import require_email_verification, get_user_from_token
+from api.services import admins
 
 router = APIRouter(
     prefix="/posts",
@@ -16,12 +22,42 @@ router = APIRouter(
 )
 
 # Reference to the posts table
-posts_table = dynamodb.Table('posts')
-comments_table = dynamodb.Table('comments')
+posts_table = get_table('posts')
+comments_table = get_table('comments')
+post_topics_table = get_table('post_topics')
+post_likes_table = get_table('post_likes')
+
+# Number of comments returned with each post in the feed
+COMMENT_PREVIEW_SIZE = 3
+MAX_COMMENT_PREVIEW_SIZE = 10
 
 # Used for logging
 logger = logging.getLogger(__name__)
 
+def topic_index_key(post: dict) -> str:
+    """
+    Sort key of a post in the post_topics index (timestamp first, so newest sorts last).
+    """
+    return f"{post['timestamp']}#{post['postId']}"
+
+async def update_topic_index(post: dict, old_topics=(), new_topics=()):
+    """
+    Keep the post_topics index in step with a post: add entries for the
+    topics it gained and remove the entries for the topics it lost.
+    """
+    old_topics, new_topics = set(old_topics), set(new_topics)
+    post_key = topic_index_key(post)
+    await post_topics_table.batch_write(
+        put_items=[
+            {'topic': topic, 'postKey': post_key, 'postId': post['postId']}
+            for topic in new_topics - old_topics
+        ],
+        delete_keys=[
+            {'topic': topic, 'postKey': post_key}
+            for topic in old_topics - new_topics
+        ]
+    )
+
 # CREATE: Add a new post
 # @router.post("/", response_model=Post)
 # async def create_post(
@@ -97,7 +133,7 @@ async def create_post(
             raise HTTPException(status_code=401, detail="Invalid authentication")
         
         # Check email verification before allowing post creation
-        await require_email_verification(author)
+        await require_email_verification(user)
         
         # Upload images to S3
         image_urls = []
@@ -116,18 +152,23 @@ async def create_post(
         )
         post_dict = post.dict()
         
-        # Initialize empty likedBy array if not provided
-        if 'likedBy' not in post_dict:
-            post_dict['likedBy'] = []
-            
+        # Likes live in the post_likes table
+        post_dict.pop('isLiked', None)
+
         # Handle empty sets for DynamoDB
         if not post_dict.get('topics'):
             post_dict['topics'] = {"general"}
         if not post_dict.get('images'):
             post_dict['images'] = {"none"}
+
+        # Every post lives in the single feed partition of FeedIndex
+        post_dict[FEED_KEY] = FEED_PARTITION
         
         # Save post to DynamoDB
-        posts_table.put_item(Item=post.dict())
+        await posts_table.put_item(Item=post_dict)
+        await update_topic_index(post_dict, new_topics=post_dict['topics'])
+        await record_topic_counts(post_dict['timestamp'], post_dict['topics'], 1)
+        keywords.ingest_post(post_dict['content'])
         logger.info(f"Post created successfully: {post.postId}")
         return post
     except ClientError as e:
@@ -147,45 +188,87 @@ async def create_post(
             detail=f"Unexpected error: {str(e)}"
         )
 
-# READ: Get all posts
-@router.get("/", response_model=list[Post])
-async def get_all_posts():
+async def attach_comment_previews(posts: List[dict], per_post: int):
     """
-    Fetch all posts from the DynamoDB table.
+    Attach the first `per_post` comments to each post. The index queries for
+    the whole page run concurrently, so a page costs at most
+    len(posts) bounded queries instead of one table scan per post.
+    """
+    if per_post == 0:
+        for post in posts:
+            post["comments"] = []
+        return
+
+    results = await asyncio.gather(*(
+        comments_table.query(
+            IndexName=COMMENTS_TIME_INDEX,
+            KeyConditionExpression=Key("postId").eq(post["postId"]),
+            ScanIndexForward=True,
+            Limit=per_post
+        )
+        for post in posts
+    ))
+    for post, result in zip(posts, results):
+        post["comments"] = result.get("Items", [])
+
+async def attach_like_state(posts: List[dict], viewer: Optional[dict]):
+    """
+    Set isLiked on each post for the viewing user, with one batched lookup
+    of the viewer's like items for the whole page.
+    """
+    liked = set()
+    username = viewer.get('username') if viewer else None
+    if username and posts:
+        keys = [{'postId': post_id, 'username': username} for post_id in {post['postId'] for post in posts}]
+        items = await batch_get(post_likes_table.name, keys, ProjectionExpression='postId')
+        liked = {item['postId'] for item in items}
+    for post in posts:
+        post['isLiked'] = post['postId'] in liked
+
+# READ: Get the post feed, newest first
+@router.get("/", response_model=list[FeedPost])
+async def get_all_posts(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    comments_per_post: int = Query(COMMENT_PREVIEW_SIZE, ge=0, le=MAX_COMMENT_PREVIEW_SIZE, description="Number of comments to include with each post"),
+    viewer: Optional[dict] = Depends(login_manager.optional)
+):
+    """
+    Fetch one page of the post feed from the time-ordered FeedIndex,
+    each post with a preview of its comments.
+    The cursor for the next page is returned in the X-Next-Cursor header.
     """
     try:
-        response = posts_table.scan()
-        posts = response.get("Items", [])
+        result = await posts_table.query(
+            IndexName=FEED_INDEX,
+            KeyConditionExpression=Key(FEED_KEY).eq(FEED_PARTITION),
+            ScanIndexForward=False,
+            **page_kwargs(limit, cursor)
+        )
+        posts = result.get("Items", [])
+        set_next_cursor(response, result)
 
-        # Attach comments to each post
-        for post in posts:
-            post_id = post["postId"]
-            comments_response = comments_table.scan(
-                FilterExpression=Key("postId").eq(post_id)
-            )
-            post["comments"] = comments_response.get("Items", [])
-            # Ensure likedBy exists
-            if 'likedBy' not in post:
-                post['likedBy'] = []
+        await asyncio.gather(
+            attach_comment_previews(posts, comments_per_post),
+            attach_like_state(posts, viewer)
+        )
 
-        return [Post(**post) for post in posts]
+        return [FeedPost(**post) for post in posts]
     except ClientError as e:
         logger.error(f"Failed to fetch all posts from DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch posts.")
 
 # READ: Get a post by postId
 @router.get("/{post_id}", response_model=Post)
-async def get_post(post_id: str):
+async def get_post(post_id: str, viewer: Optional[dict] = Depends(login_manager.optional)):
     try:
-        response = posts_table.get_item(Key={'postId': post_id})
+        response = await posts_table.get_item(Key={'postId': post_id})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="Post not found.")
         
         post = response['Item']
-        # Ensure likedBy exists
-        if 'likedBy' not in post:
-            post['likedBy'] = []
-            
+        await attach_like_state([post], viewer)
         return post
     except ClientError as e:
         logger.error(f"Failed to query DynamoDB: {e}")
@@ -193,88 +276,121 @@ async def get_post(post_id: str):
 
 # READ: Get trending topics and keywords
 @router.get("/trends/trending-topics", response_model=dict)
-def trending_topics():
+async def trending_topics(
+    window: str = Query("all", pattern="^(24h|7d|all)$", description="Time window: 24h, 7d or all")
+):
     try:
-        response = posts_table.scan()
-        posts = response.get("Items", [])
-        topics = get_trending_topics(posts)
+        topics = await get_trending_topic_counts(window)
         return {"trending_topics": [[topic, count] for topic, count in topics]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch trending topics: {e}")
 
 @router.get("/trends/trending-keywords", response_model=dict)
-def trending_keywords():
-    try:
-        response = posts_table.scan()
-        posts = response.get("Items", [])
-        
-        formatted_posts = []
-        for post in posts:
-            if 'content' in post:
-                formatted_posts.append({
-                    'content': str(post['content']),
-                    'topics': post.get('topics', [])
-                })
-        
-        keywords = get_trending_keywords(formatted_posts)
-        return {"trending_keywords": [[word, count] for word, count in keywords]}
-    except Exception as e:
-        print(f"Error details: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to fetch trending keywords: {e}")
+async def trending_keywords(
+    limit: int = Query(keywords.TRENDING_KEYWORDS_K, ge=1, le=keywords.TRENDING_KEYWORDS_K, description="Maximum number of keywords to return")
+):
+    """
+    Keywords of recent posts, most frequent first, with counts decayed over time.
+    Served from the in-memory keyword counters, without reading DynamoDB.
+    """
+    return {"trending_keywords": [[word, count] for word, count in keywords.trending_keywords(limit)]}
 
 # READ: Get all posts by an author
 @router.get("/filter/author/{author}", response_model=list[Post])
-async def get_posts_by_author(author: str):
+async def get_posts_by_author(
+    author: str,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    viewer: Optional[dict] = Depends(login_manager.optional)
+):
+    """
+    Fetch one page of an author's posts, newest first, from the author index.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
     try:
-        response = posts_table.scan()
-        items = response.get('Items', [])
-        if not items:
-            raise HTTPException(status_code=404, detail="No posts found.")
-
-        filtered_items = [item for item in items if item.get('author') == author]
-        
-        # Ensure likedBy exists for each post
-        for item in filtered_items:
-            if 'likedBy' not in item:
-                item['likedBy'] = []
+        result = await posts_table.query(
+            IndexName=POSTS_AUTHOR_INDEX,
+            KeyConditionExpression=Key('author').eq(author),
+            ScanIndexForward=False,
+            **page_kwargs(limit, cursor)
+        )
+        items = result.get('Items', [])
+        set_next_cursor(response, result)
 
-        if not filtered_items:
+        if not items and not cursor:
             raise HTTPException(status_code=404, detail="No posts found for the given author.")
 
-        return filtered_items
+        await attach_like_state(items, viewer)
+
+        return items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching posts by author: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch posts.")
 
+async def query_topic_stream(topic: str, before: Optional[str], limit: int) -> dict:
+    """
+    Query the newest `limit` index entries of one topic, older than `before` if given.
+    """
+    condition = Key('topic').eq(topic)
+    if before:
+        condition = condition & Key('postKey').lt(before)
+    return await post_topics_table.query(
+        KeyConditionExpression=condition,
+        ScanIndexForward=False,
+        Limit=limit
+    )
+
 @router.get("/filter/topics", response_model=List[Post])
-async def get_posts_by_topics(topics: List[str] = Query(..., description="List of topics to filter by")):
+async def get_posts_by_topics(
+    response: Response,
+    topics: List[str] = Query(..., description="List of topics to filter by"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    viewer: Optional[dict] = Depends(login_manager.optional)
+):
+    """
+    Fetch one page of posts having any of the given topics, newest first.
+    Each topic's entries in the post_topics index are read newest first and
+    merged; the cursor is the sort key of the last post on the page, so the
+    next page continues every topic stream below it.
+    """
     try:
         if not topics:
             raise HTTPException(status_code=400, detail="At least one topic must be specified.")
         topic_list = [topic.strip() for topic in topics[0].split(',')]
         topic_set = {topic.replace('+', ' ').strip() for topic in topic_list}
-        response = posts_table.scan()
-        items = response.get('Items', [])
-        if not items:
-            raise HTTPException(status_code=404, detail="No posts found.")
-        topic_list = [topic.replace('+', ' ') for topic in topic_list]
-
-        filtered_items = [
-            item for item in items 
-            if "topics" in item and (
-                len(set(item["topics"]) & topic_set) > 0
-            )
-        ]
+        before = (decode_cursor(cursor) or {}).get('postKey')
+
+        results = await asyncio.gather(*(query_topic_stream(topic, before, limit) for topic in topic_set))
 
-        # Ensure likedBy exists for each post
-        for item in filtered_items:
-            if 'likedBy' not in item:
-                item['likedBy'] = []
+        # A post with several of the topics shows up once per topic
+        candidates, seen = [], set()
+        streams = [result.get('Items', []) for result in results]
+        for entry in heapq.merge(*streams, key=lambda entry: entry['postKey'], reverse=True):
+            if entry['postId'] not in seen:
+                seen.add(entry['postId'])
+                candidates.append(entry)
 
-        if not filtered_items:
+        page = candidates[:limit]
+        has_more = len(candidates) > limit or any('LastEvaluatedKey' in result for result in results)
+        if has_more and page:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor({'postKey': page[-1]['postKey']})
+
+        posts = await batch_get(posts_table.name, [{'postId': entry['postId']} for entry in page])
+        posts_by_id = {post['postId']: post for post in posts}
+        filtered_items = [posts_by_id[entry['postId']] for entry in page if entry['postId'] in posts_by_id]
+
+        if not filtered_items and not cursor:
             raise HTTPException(status_code=404, detail="No posts found for the given topics.")
 
+        await attach_like_state(filtered_items, viewer)
+
         return filtered_items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching posts: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to fetch posts.")
@@ -284,7 +400,7 @@ async def get_posts_by_topics(topics: List[str] = Query(..., description="List o
 async def update_post(post_id: str, update_data: UpdatePostModel):
     try:
         # First check if post exists
-        response = posts_table.get_item(Key={"postId": post_id})
+        response = await posts_table.get_item(Key={"postId": post_id})
         if "Item" not in response:
             raise HTTPException(status_code=404, detail="Post not found.")
 
@@ -300,11 +416,6 @@ async def update_post(post_id: str, update_data: UpdatePostModel):
             expression_attribute_values[":content"] = update_data.content
             expression_attribute_names["#content"] = "content"
 
-        if update_data.likes is not None:
-            update_expression_parts.append("#likes = :likes")
-            expression_attribute_values[":likes"] = update_data.likes
-            expression_attribute_names["#likes"] = "likes"
-
         if update_data.topics is not None:
             # Ensure topics is not an empty set for DynamoDB
             topics_set = update_data.topics if update_data.topics else {"general"}
@@ -317,7 +428,7 @@ async def update_post(post_id: str, update_data: UpdatePostModel):
 
         # Perform the update
         try:
-            response = posts_table.update_item(
+            response = await posts_table.update_item(
                 Key={"postId": post_id},
                 UpdateExpression="SET " + ", ".join(update_expression_parts),
                 ExpressionAttributeValues=expression_attribute_values,
@@ -326,10 +437,16 @@ async def update_post(post_id: str, update_data: UpdatePostModel):
             )
             
             updated_post = response.get("Attributes", {})
+
+            if update_data.topics is not None:
+                old_topics = set(post.get("topics", []))
+                new_topics = set(updated_post.get("topics", []))
+                await update_topic_index(updated_post, old_topics=old_topics, new_topics=new_topics)
+                await record_topic_counts(updated_post["timestamp"], new_topics - old_topics, 1)
+                await record_topic_counts(updated_post["timestamp"], old_topics - new_topics, -1)
             
             # Ensure required fields exist
-            if 'likedBy' not in updated_post:
-                updated_post['likedBy'] = []
+            updated_post.pop('likedBy', None)
             if 'topics' not in updated_post or not updated_post['topics']:
                 updated_post['topics'] = {"general"}
             if 'images' not in updated_post or not updated_post['images']:
@@ -354,18 +471,34 @@ async def update_post(post_id: str, update_data: UpdatePostModel):
             detail=f"Unexpected error updating post: {str(e)}"
         )
 
+async def delete_post_likes(post_id: str):
+    """
+    Remove all like items of a deleted post.
+    """
+    kwargs = {}
+    while True:
+        result = await post_likes_table.query(
+            KeyConditionExpression=Key('postId').eq(post_id),
+            ProjectionExpression='postId, username',
+            **kwargs
+        )
+        await post_likes_table.batch_write(delete_keys=result.get('Items', []))
+        if 'LastEvaluatedKey' not in result:
+            break
+        kwargs['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
 # DELETE: Delete a post by postId
 @router.delete("/{post_id}", response_model=dict)
 async def delete_post(post_id: str, user: dict = Depends(login_manager)):
     try:
-        response = posts_table.get_item(Key={"postId": post_id})
+        response = await posts_table.get_item(Key={"postId": post_id})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="Post not found.")
 
         post = response['Item']
 
         # Allow admins to delete any post, but regular users can only delete their own posts
-        if post["author"] != user["username"] and user.get("role") != "admin":
+        if post["author"] != user["username"] and not admins.is_admin(user.get("email")):
             raise HTTPException(status_code=403, detail="Access forbidden: You are not the author of this post.")
 
         if "images" in post:
@@ -373,7 +506,10 @@ async def delete_post(post_id: str, user: dict = Depends(login_manager)):
                 delete_image(image_url, "post-pictures")
 
         # Delete the post
-        posts_table.delete_item(Key={"postId": post_id})
+        await posts_table.delete_item(Key={"postId": post_id})
+        await update_topic_index(post, old_topics=post.get("topics", []))
+        await record_topic_counts(post["timestamp"], post.get("topics", []), -1)
+        await delete_post_likes(post_id)
         logger.info(f"Post {post_id} deleted successfully by user {user['username']}.")
         return {"message": f"Post {post_id} deleted successfully."}
     except ClientError as e:
@@ -382,70 +518,106 @@ async def delete_post(post_id: str, user: dict = Depends(login_manager)):
 
 
 
+async def move_legacy_likes(post_id: str):
+    """
+    Move a post's likedBy list or set (written before likes had their own
+    table) into post_likes, so a like is never counted twice.
+    """
+    response = await posts_table.get_item(Key={'postId': post_id}, ProjectionExpression='likedBy')
+    liked_by = response.get('Item', {}).get('likedBy')
+    if liked_by is None:
+        return
+
+    likers = set(liked_by)
+    await post_likes_table.batch_write(
+        put_items=[{'postId': post_id, 'username': username} for username in likers]
+    )
+    try:
+        await posts_table.update_item(
+            Key={'postId': post_id},
+            UpdateExpression='SET likes = :likes REMOVE likedBy',
+            ConditionExpression='likedBy = :old',
+            ExpressionAttributeValues={':old': liked_by, ':likes': len(likers)}
+        )
+    except ClientError as e:
+        # Moved concurrently by another request
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+
+async def set_like(post_id: str, username: str, liked: bool):
+    """
+    Add or remove one like item and adjust the post's like counter in a
+    single transaction. The like item's condition fails if the post is
+    already in the requested state; the post's if it is missing or still
+    has a legacy likedBy attribute.
+    """
+    like_key = {'postId': post_id, 'username': username}
+    if liked:
+        like_write = {'Put': {
+            'TableName': post_likes_table.name,
+            'Item': {**like_key, 'likedAt': sortable_timestamp()},
+            'ConditionExpression': 'attribute_not_exists(username)'
+        }}
+    else:
+        like_write = {'Delete': {
+            'TableName': post_likes_table.name,
+            'Key': like_key,
+            'ConditionExpression': 'attribute_exists(username)'
+        }}
+    await transact_write([
+        like_write,
+        {'Update': {
+            'TableName': posts_table.name,
+            'Key': {'postId': post_id},
+            'UpdateExpression': 'ADD likes :delta',
+            'ConditionExpression': 'attribute_exists(postId) AND attribute_not_exists(likedBy)',
+            'ExpressionAttributeValues': {':delta': 1 if liked else -1}
+        }}
+    ])
+
+# Like, then unlike, attempts before giving up on a post whose likes keep changing
+LIKE_ATTEMPTS = 3
+
 @router.post("/{post_id}/like")
 async def like_post(post_id: str, like_request: LikeRequest):
+    """
+    Toggle the user's like on a post. The like item and the post's like
+    counter change in one transaction, so concurrent likes are never lost
+    and the post item does not grow with its likers.
+    """
+    username = like_request.username
+    logger.info(f"Like request received for post {post_id} from user {username}")
     try:
-        # Log incoming request
-        logger.info(f"Like request received for post {post_id} from user {like_request.username}")
-        
-        # Get the post
-        try:
-            response = posts_table.get_item(Key={'postId': post_id})
-            logger.info(f"DynamoDB response: {response}")
-        except ClientError as e:
-            logger.error(f"DynamoDB get_item error: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to fetch post from database")
-            
-        if 'Item' not in response:
-            raise HTTPException(status_code=404, detail="Post not found")
-            
-        post = response['Item']
-        username = like_request.username
-        liked_by = post.get('likedBy', [])
-        current_likes = post.get('likes', 0)
-        
-        logger.info(f"Current state - likes: {current_likes}, likedBy: {liked_by}")
-        
-        # Toggle like status
-        if username in liked_by:
-            # Unlike the post
-            liked_by.remove(username)
-            current_likes = max(0, current_likes - 1)  # Ensure likes don't go below 0
-            logger.info(f"Removing like from user {username}")
-        else:
-            # Like the post
-            if username not in liked_by:  # Extra check to ensure no duplicate likes
-                liked_by.append(username)
-                current_likes += 1
-                logger.info(f"Adding like from user {username}")
-            
-        # Update the post
-        try:
-            update_response = posts_table.update_item(
-                Key={'postId': post_id},
-                UpdateExpression='SET likes = :likes, likedBy = :likedBy',
-                ExpressionAttributeValues={
-                    ':likes': current_likes,
-                    ':likedBy': liked_by
-                },
-                ReturnValues="ALL_NEW"
-            )
-            logger.info(f"DynamoDB update response: {update_response}")
-        except ClientError as e:
-            logger.error(f"DynamoDB update_item error: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to update like status in database")
-        
-        result = {
-            "success": True,
-            "likes": current_likes,
-            "isLiked": username in liked_by
-        }
-        logger.info(f"Returning result: {result}")
-        return result
-        
+        for _ in range(LIKE_ATTEMPTS):
+            # Try to like; if already liked, unlike instead
+            for liked in (True, False):
+                try:
+                    await set_like(post_id, username, liked)
+                except ClientError as e:
+                    if e.response['Error']['Code'] != 'TransactionCanceledException':
+                        raise
+                    like_reason, post_reason = cancellation_reasons(e, 2)
+                    if post_reason == 'ConditionalCheckFailed':
+                        response = await posts_table.get_item(Key={'postId': post_id}, ProjectionExpression='postId')
+                        if 'Item' not in response:
+                            raise HTTPException(status_code=404, detail="Post not found")
+                        await move_legacy_likes(post_id)
+                        break
+                    if like_reason != 'ConditionalCheckFailed':
+                        raise
+                    continue
+
+                response = await posts_table.get_item(Key={'postId': post_id}, ProjectionExpression='likes', ConsistentRead=True)
+                return {
+                    "success": True,
+                    "likes": int(response.get('Item', {}).get('likes', 0)),
+                    "isLiked": liked
+                }
+
+        raise HTTPException(status_code=409, detail="Like status changed concurrently, please retry")
     except HTTPException as he:
         raise he
-    except Exception as e:
-        logger.error(f"Error in like_post: {str(e)}", exc_info=True)  # Added exc_info for full traceback
-        raise HTTPException(status_code=500, detail=f"Failed to process like: {str(e)}")
+    except ClientError as e:
+        logger.error(f"DynamoDB like update error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to update like status in database")
 
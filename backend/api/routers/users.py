@@ -1,24 +1,30 @@
 # backend/api/routes/users.py
 from typing import List, Optional
-from fastapi import APIRouter, File, Form, HTTPException, Request, Depends, UploadFile, status
+from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, Query, Request, Response, Depends, UploadFile, status
 from api.aws_wrappers.images import delete_image, upload_image
-from api.db_setup import dynamodb
-from api.config import login_manager
+from api.aws_wrappers.dynamo import get_table, transact_write, cancellation_reasons, page_kwargs, set_next_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from api.config import login_manager, invalidate_user, TOKEN_VERSION_CLAIM
 from api.models.user import UserCreate, UserResponse, LoginRequest, UserUpdateRequest, ProfilePicResponse, ForgotPasswordRequest, ResetPasswordRequest
-from fastapi.responses import RedirectResponse
-from passlib.context import CryptContext
-from boto3.dynamodb.conditions import Attr
-from boto3.dynamodb.conditions import Key
+from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from boto3.dynamodb.conditions import Attr, Key
 from fastapi.concurrency import run_in_threadpool
 from botocore.exceptions import ClientError
 import logging
 from decimal import Decimal
 from api.routers.fitness import create_default_tasks_for_user
+from api.nlp.search_index import TrigramIndex
+from api.nlp.interests import InterestIndex
+from api.db_setup import USERS_COUNTER, hash_token, user_token_item
+import asyncio
+import csv
+import io
+import json
 import secrets
 from datetime import datetime, timedelta
 from api.services.email_service import send_verification_email, send_welcome_email_with_pdf, send_password_reset_email
+from api.services import passwords, admins
 import hashlib
-from boto3.dynamodb.conditions import Attr
 import time
 import boto3
 import os
@@ -29,43 +35,110 @@ router = APIRouter(
     tags=["users"]
 )
 
-# Initialize password context for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 s3_client = boto3.client('s3', region_name=os.getenv('AWS_REGION', 'us-east-2'))
 
 # Reference to the users table
-users_table = dynamodb.Table('users')
-admins_table = dynamodb.Table('admins')
+users_table = get_table('users')
+admins_table = get_table('admins')
+user_tokens_table = get_table('user_tokens')
+counters_table = get_table('counters')
+user_emails_table = get_table('user_emails')
+
+# Purposes of user_tokens items and how long tokens stay valid
+VERIFY_EMAIL = 'verify_email'
+RESET_PASSWORD = 'reset_password'
+TOKEN_LIFETIMES = {
+    VERIFY_EMAIL: timedelta(hours=24),
+    RESET_PASSWORD: timedelta(hours=1),
+}
 
+# Last count read, returned if the counter cannot be read
 _user_count_cache = {
-    'count': 0,
-    'last_updated': 0
+    'count': 0
 }
-CACHE_TTL = 3600 # 1 hour in seconds
 
 # Used for logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Rebuild interval of the user search index, so every worker also sees
+# users registered or changed through the others
+USER_SEARCH_REFRESH_SECONDS = int(os.getenv('USER_SEARCH_REFRESH_SECONDS', '300'))
+
+# Profile fields held by the user search index; never credentials, tokens or contact details
+USER_SEARCH_FIELDS = [
+    'username', 'firstName', 'lastName', 'isVeteran', 'interests', 'profilePic',
+    'employmentStatus', 'workLocation', 'liveState', 'liveLocation'
+]
+# Fields returned by user search
+USER_RESULT_FIELDS = ['username', 'firstName', 'lastName', 'isVeteran', 'interests', 'profilePic']
+
+# Public user profiles searchable by username and name, kept in memory
+user_search_index = TrigramIndex({'username': 2.0, 'firstName': 1.5, 'lastName': 1.5, 'fullName': 1.0})
+# Users by interest, for suggestions
+user_interest_index = InterestIndex()
+# Suggestions are padded with other users up to this many
+MIN_SUGGESTIONS = 5
+
+def search_profile(user: dict) -> dict:
+    profile = {field: user[field] for field in USER_SEARCH_FIELDS if field in user}
+    # Lets "first last" queries match across both name fields
+    profile['fullName'] = f"{user.get('firstName', '')} {user.get('lastName', '')}"
+    return profile
+
+def index_user(user: dict):
+    user_search_index.add(user['username'], search_profile(user))
+    user_interest_index.set(user['username'], user.get('interests'))
+
+def unindex_user(username: str):
+    user_search_index.remove(username)
+    user_interest_index.remove(username)
+
+async def scan_users(fields: List[str]) -> List[dict]:
+    users = []
+    kwargs = {}
+    while True:
+        result = await users_table.scan(
+            ProjectionExpression=", ".join(f"#{field}" for field in fields),
+            ExpressionAttributeNames={f"#{field}": field for field in fields},
+            **kwargs
+        )
+        users.extend(result.get('Items', []))
+        if 'LastEvaluatedKey' not in result:
+            return users
+        kwargs['ExclusiveStartKey'] = result['LastEvaluatedKey']
+
+async def warm_user_search_index():
+    """
+    Rebuild the user search index from the users table and swap it in.
+    """
+    try:
+        users = await scan_users(USER_SEARCH_FIELDS)
+    except ClientError as e:
+        logger.error(f"Failed to load users for the search index: {e}")
+        return
+    user_search_index.replace_all((user['username'], search_profile(user)) for user in users)
+    user_interest_index.replace_all((user['username'], user.get('interests')) for user in users)
+    logger.info(f"User search index built from {len(users)} users")
+
+async def refresh_user_search_index():
+    while True:
+        await asyncio.sleep(USER_SEARCH_REFRESH_SECONDS)
+        await warm_user_search_index()
+
 # After importing login_manager
 
 @router.get("/count")
 async def get_user_count():
-    current_time = time.time()
-    
-    # Return cached value if still valid
-    if current_time - _user_count_cache['last_updated'] < CACHE_TTL:
-        return {"count": _user_count_cache['count'], "cached": True}
-    
-    # Cache expired, fetch new count
+    """
+    Number of users, from the counter maintained on registration and deletion.
+    """
     try:
-        response = users_table.scan(Select='COUNT')
-        count = response.get('Count', 0)
+        response = await counters_table.get_item(Key={'counterId': USERS_COUNTER})
+        count = int(response.get('Item', {}).get('count', 0))
         
         # Update cache
         _user_count_cache['count'] = count
-        _user_count_cache['last_updated'] = current_time
         
         return {"count": count, "cached": False}
     except Exception as e:
@@ -73,13 +146,167 @@ async def get_user_count():
         # Return stale cache if fetch fails
         return {"count": _user_count_cache['count'], "cached": True}
 
+def require_admin(user: dict):
+    if not admins.is_admin(user.get("email")):
+        raise HTTPException(status_code=403, detail="Access forbidden. Admin privileges required.")
+
+@router.get("/admin/password-hashing")
+async def get_password_hashing_stats(user: dict = Depends(login_manager)):
+    """
+    Load of the password hashing pool: requests queued for a worker, the
+    most ever queued, and hashes completed by this worker process.
+    Only admin users can access this endpoint.
+    """
+    require_admin(user)
+    return passwords.stats()
+
+async def add_to_user_count(delta: int):
+    try:
+        await counters_table.update_item(
+            Key={'counterId': USERS_COUNTER},
+            UpdateExpression='ADD #count :delta',
+            ExpressionAttributeNames={'#count': 'count'},
+            ExpressionAttributeValues={':delta': delta}
+        )
+    except ClientError as e:
+        logger.error(f"Failed to update user count: {e}")
+
+
+async def get_password_hash(password: str) -> str:
+    return await passwords.hash_password(password)
+
+def new_token(username: str, purpose: str) -> tuple:
+    """
+    A fresh token for the user and the user_tokens item to store for it.
+    """
+    token = secrets.token_urlsafe(32)
+    expiry = datetime.utcnow() + TOKEN_LIFETIMES[purpose]
+    return token, user_token_item(token, username, purpose, expiry)
+
+async def issue_token(username: str, purpose: str) -> str:
+    """
+    Create a token for the user; only its hash is stored, in user_tokens.
+    """
+    token, token_item = new_token(username, purpose)
+    await user_tokens_table.put_item(Item=token_item)
+    return token
+
+async def find_token(token: str, purpose: str) -> Optional[dict]:
+    """
+    The user_tokens item of a token issued for `purpose`, or None. Expired
+    items can still be returned until TTL deletes them; see token_expired.
+    """
+    response = await user_tokens_table.get_item(Key={'tokenHash': hash_token(token)}, ConsistentRead=True)
+    item = response.get('Item')
+    if item is None or item.get('purpose') != purpose:
+        return None
+    return item
+
+def token_expired(token_item: dict) -> bool:
+    return time.time() > token_item['expiresAt']
+
+async def consume_token(token_item: dict) -> bool:
+    """
+    Delete a token so it cannot be used again. False if it was already used.
+    """
+    try:
+        await user_tokens_table.delete_item(
+            Key={'tokenHash': token_item['tokenHash']},
+            ConditionExpression='attribute_exists(tokenHash)'
+        )
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            return False
+        raise
+
+def claim_email_write(email: str, username: str) -> dict:
+    """
+    Transaction item claiming an email for a user; it fails if another
+    user holds the email.
+    """
+    return {'Put': {
+        'TableName': user_emails_table.name,
+        'Item': {'email': email, 'username': username},
+        'ConditionExpression': 'attribute_not_exists(email) OR username = :username',
+        'ExpressionAttributeValues': {':username': username}
+    }}
+
+async def save_user_update(username: str, update_expression: str, values: dict,
+                           old_email: Optional[str], new_email: Optional[str]) -> dict:
+    """
+    Apply a profile update to the user item and return the updated user.
+    When the email changes, the update, the claim of the new email and the
+    release of the old one are written in one transaction. Raises a 400 if
+    another user holds the new email and a 404 if the user is gone.
+    """
+    if new_email is None or new_email == old_email:
+        response = await users_table.update_item(
+            Key={"username": username},
+            UpdateExpression=update_expression,
+            ConditionExpression="attribute_exists(username)",
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_NEW",
+        )
+        return response['Attributes']
+
+    writes = [
+        {'Update': {
+            'TableName': users_table.name,
+            'Key': {'username': username},
+            'UpdateExpression': update_expression,
+            'ConditionExpression': 'attribute_exists(username)',
+            'ExpressionAttributeValues': values
+        }},
+        claim_email_write(new_email, username),
+    ]
+    if old_email:
+        writes.append({'Delete': {
+            'TableName': user_emails_table.name,
+            'Key': {'email': old_email},
+            'ConditionExpression': 'attribute_not_exists(email) OR username = :username',
+            'ExpressionAttributeValues': {':username': username}
+        }})
+    try:
+        await transact_write(writes)
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'TransactionCanceledException':
+            raise
+        user_reason, claim_reason = cancellation_reasons(e, 2)
+        if user_reason == 'ConditionalCheckFailed':
+            raise HTTPException(status_code=404, detail="User not found.")
+        if claim_reason == 'ConditionalCheckFailed':
+            raise HTTPException(status_code=400, detail="Email already in use.")
+        raise
+    # Transactions return no attributes, so read the updated user back
+    response = await users_table.get_item(Key={"username": username}, ConsistentRead=True)
+    return response['Item']
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def release_email(username: str, email: Optional[str]):
+    """
+    Free a deleted user's email for registration. Claims held by another
+    user are left alone.
+    """
+    if not email:
+        return
+    try:
+        await user_emails_table.delete_item(
+            Key={'email': email},
+            ConditionExpression='username = :username',
+            ExpressionAttributeValues={':username': username}
+        )
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            logger.error(f"Failed to release email of {username}: {e}")
 
 # 1. FIXED PATH ROUTES (most specific, no path parameters)
 @router.post("/register", response_model=UserResponse)
-async def register_user(user: UserCreate):
+async def register_user(user: UserCreate, background_tasks: BackgroundTasks):
+    """
+    Create a user. The user item, the email claim, the users counter and the
+    verification token are written in one transaction, whose conditions
+    reject a taken username or email.
+    """
     if not user.isVeteran:
         raise HTTPException(status_code=403, detail="This is a veteran community only.")
     if not user.agreedToDisclosures:
@@ -88,33 +315,8 @@ async def register_user(user: UserCreate):
     normalized_username = user.username.lower()
     normalized_email = user.email.lower() if user.email else None
     logger.info(f"Attempt to register user: {user.username}")
-    
-    try:
-        response = users_table.get_item(Key={'username': normalized_username})
-    except ClientError as e:
-        logger.error(f"Failed to query DynamoDB: {e}")
-        err_code = e.response['Error']['Code']
-        if err_code == 'ResourceNotFoundException':
-            raise HTTPException(status_code=500, detail="User table does not exist")
-        raise HTTPException(status_code=500, detail="Internal server error.")
-    else:
-        if 'Item' in response:
-            raise HTTPException(status_code=400, detail="Username already exists.")
-    
-    if normalized_email:
-        try:
-            email_response = users_table.query(
-                IndexName='email-index',
-                KeyConditionExpression=Key('email').eq(normalized_email)
-            )
-        except ClientError as e:
-            logger.error(f"Failed to query users_table for email: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error.")
 
-        if email_response.get('Items'):
-            raise HTTPException(status_code=400, detail="Email already in use.")
-
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
 
     # Prepare the user item with required fields
     user_item = {
@@ -160,63 +362,84 @@ async def register_user(user: UserCreate):
         if user.weight is not None:
             user_item['weight'] = Decimal(str(user.weight))
         
-    # Generate verification token with expiration
-    verification_token = secrets.token_urlsafe(32)
-    token_expiry = datetime.utcnow() + timedelta(hours=24)
-    
-    # Add to user item
     user_item['email_verified'] = False
-    user_item['verification_token'] = verification_token
-    user_item['token_expiry'] = token_expiry.isoformat()
-
-    try:
-        # Save the user in DynamoDB
-        users_table.put_item(Item=user_item)
-
-        # Verification email sent after registration, removed to reduce unnecessary emails
-        # if user.email:
-        #     email_sent = await send_verification_email(user.email, verification_token, user.username)
-        #     if not email_sent:
-        #         logger.warning(f"Failed to send verification email to {user.email}")
-        #     # pass #disabled for now
 
-        await create_default_tasks_for_user(normalized_username)
+    # Generate verification token with expiration
+    verification_token, token_item = new_token(normalized_username, VERIFY_EMAIL)
+
+    writes = [
+        {'Put': {
+            'TableName': users_table.name,
+            'Item': user_item,
+            'ConditionExpression': 'attribute_not_exists(username)'
+        }},
+        {'Update': {
+            'TableName': counters_table.name,
+            'Key': {'counterId': USERS_COUNTER},
+            'UpdateExpression': 'ADD #count :delta',
+            'ExpressionAttributeNames': {'#count': 'count'},
+            'ExpressionAttributeValues': {':delta': 1}
+        }},
+        {'Put': {
+            'TableName': user_tokens_table.name,
+            'Item': token_item
+        }},
+    ]
+    if normalized_email:
+        writes.append(claim_email_write(normalized_email, normalized_username))
 
+    try:
+        await transact_write(writes)
     except ClientError as e:
         logger.error(f"Failed to save user to DynamoDB: {e}")
-        error_code = e.response['Error']['Code']
-        if error_code == 'ConditionalCheckFailedException':
-            raise HTTPException(status_code=400, detail="Failed to register user due to a condition check failure.")
+        if e.response['Error']['Code'] == 'TransactionCanceledException':
+            reasons = cancellation_reasons(e, len(writes))
+            if reasons[0] == 'ConditionalCheckFailed':
+                raise HTTPException(status_code=400, detail="Username already exists.")
+            if normalized_email and reasons[-1] == 'ConditionalCheckFailed':
+                raise HTTPException(status_code=400, detail="Email already in use.")
         raise HTTPException(status_code=500, detail="Failed to save user data.")
 
+    index_user(user_item)
+
+    # Verification email sent after registration, removed to reduce unnecessary emails
+    # if user.email:
+    #     email_sent = await send_verification_email(user.email, verification_token, user.username)
+    #     if not email_sent:
+    #         logger.warning(f"Failed to send verification email to {user.email}")
+    #     # pass #disabled for now
+
+    # Runs after the response is sent
+    background_tasks.add_task(create_default_tasks_for_user, normalized_username)
+
     return user_item
 
 @router.get("/verify-email")
 async def verify_email(token: str):
     """Verify email with token"""
     try:
-        # Query users table for verification token
-        response = users_table.scan(
-            FilterExpression=Attr('verification_token').eq(token)
-        )
-        
-        if not response['Items']:
+        # Look up the verification token
+        token_item = await find_token(token, VERIFY_EMAIL)
+        if token_item is None:
             raise HTTPException(status_code=400, detail="Invalid or expired verification token")
-        
-        user = response['Items'][0]
-        
+
         # Check if token is expired
-        if 'token_expiry' in user:
-            expiry = datetime.fromisoformat(user['token_expiry'])
-            if datetime.utcnow() > expiry:
-                raise HTTPException(status_code=400, detail="Verification token has expired")
-        
+        if token_expired(token_item):
+            raise HTTPException(status_code=400, detail="Verification token has expired")
+
+        if not await consume_token(token_item):
+            raise HTTPException(status_code=400, detail="Invalid or expired verification token")
+
         # Update user as verified
-        users_table.update_item(
-            Key={'username': user['username']},
-            UpdateExpression='SET email_verified = :verified REMOVE verification_token, token_expiry',
-            ExpressionAttributeValues={':verified': True}
+        response = await users_table.update_item(
+            Key={'username': token_item['username']},
+            UpdateExpression='SET email_verified = :verified',
+            ConditionExpression='attribute_exists(username)',
+            ExpressionAttributeValues={':verified': True},
+            ReturnValues='ALL_NEW'
         )
+        user = response['Attributes']
+        invalidate_user(user['username'])
         
         logger.info(f"Email verified for user: {user['username']}")
         
@@ -241,12 +464,13 @@ async def verify_email(token: str):
 async def resend_verification_email(email: str):
     """Resend verification email"""
     try:
-        # Find user by email
-        response = users_table.scan(
-            FilterExpression=Attr('email').eq(email.lower())
+        # Find user by email using the email index
+        response = await users_table.query(
+            IndexName='email-index',
+            KeyConditionExpression=Key('email').eq(email.lower())
         )
         
-        if not response['Items']:
+        if not response.get('Items'):
             raise HTTPException(status_code=404, detail="User not found")
         
         user = response['Items'][0]
@@ -255,18 +479,7 @@ async def resend_verification_email(email: str):
             raise HTTPException(status_code=400, detail="Email already verified")
         
         # Generate new token
-        verification_token = secrets.token_urlsafe(32)
-        token_expiry = datetime.utcnow() + timedelta(hours=24)
-        
-        # Update user with new token
-        users_table.update_item(
-            Key={'username': user['username']},
-            UpdateExpression='SET verification_token = :token, token_expiry = :expiry',
-            ExpressionAttributeValues={
-                ':token': verification_token,
-                ':expiry': token_expiry.isoformat()
-            }
-        )
+        verification_token = await issue_token(user['username'], VERIFY_EMAIL)
         
         # Send new verification email
         email_sent = await send_verification_email(user['email'], verification_token, user['username'])
@@ -283,8 +496,18 @@ async def resend_verification_email(email: str):
         raise HTTPException(status_code=500, detail="Failed to resend verification email")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await passwords.verify_password(plain_password, hashed_password)
+
+def token_data(user_data: dict) -> dict:
+    """
+    The data signed into a user's access token (see VersionedLoginManager).
+    The token stops being accepted once the user's tokenVersion is bumped.
+    """
+    return {
+        "sub": user_data['username'],
+        TOKEN_VERSION_CLAIM: int(user_data.get('tokenVersion', 0)),
+    }
 
 @router.post("/login")
 async def login_user(request: Request, login_data: LoginRequest):
@@ -293,7 +516,7 @@ async def login_user(request: Request, login_data: LoginRequest):
     logger.info(f"Attempt to login user: {username}")
     
     try:
-        response = users_table.get_item(Key={'username': username})
+        response = await users_table.get_item(Key={'username': username})
     except ClientError as e:
         logger.error(f"Failed to query DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Internal server error.")
@@ -305,24 +528,17 @@ async def login_user(request: Request, login_data: LoginRequest):
     user_data = response['Item']
     stored_password = user_data.get('password')
 
-    if not verify_password(password, stored_password):
+    if not await verify_password(password, stored_password):
         logger.warning(f"Invalid password for user: {username}")
         raise HTTPException(status_code=400, detail="Invalid password.")
     
-    email_verified = user_data.get('email_verified', False)
-    
     # Generate a token for the user
     token = login_manager.create_access_token(
-        data={"sub": username},
+        data=token_data(user_data),
         expires=timedelta(hours=8)
     )
-
-    role = "veteran"
-    try:
-        admin = admins_table.get_item(Key={'email': user_data.get('email')})
-        role = "admin" if 'Item' in admin else "veteran"
-    except ClientError as e:
-        logger.error(f"This is not an admin")
+    role = admins.role_for(user_data.get('email'))
+    email_verified = user_data.get('email_verified', False)
 
     # Return the token as JSON instead of RedirectResponse
     return {"access_token": token, "token_type": "bearer", "role": role, "email_verified": email_verified, "username": username}
@@ -335,66 +551,103 @@ def logout(user: dict = Depends(login_manager)):
 async def refresh_token(current_user: dict = Depends(login_manager)):
     """Refresh the user's access token"""
     try:
+        response = await users_table.get_item(Key={'username': current_user["username"]})
+        if 'Item' not in response:
+            raise HTTPException(status_code=401, detail="Token refresh failed")
+
         # Create new token with same 8-hour expiration
         new_token = login_manager.create_access_token(
-            data={"sub": current_user["username"]},
+            data=token_data(response['Item']),
             expires=timedelta(hours=8)
         )
         return {"access_token": new_token, "token_type": "bearer"}
     except Exception as e:
         raise HTTPException(status_code=401, detail="Token refresh failed")
 
+# Fields of the admin user list and export
+ADMIN_USER_FIELDS = [
+    "username", "firstName", "lastName", "email", "phoneNumber", "interests", "isVeteran",
+    "profilePic", "employmentStatus", "workLocation", "liveState", "liveLocation", "height", "weight"
+]
+# Parallel scan segments and items per scan page of the user export
+EXPORT_SEGMENTS = 4
+EXPORT_PAGE_SIZE = 500
+
+def admin_users_scan_kwargs() -> dict:
+    # Veteran users only, with just the fields the admin dashboard shows
+    return {
+        "ProjectionExpression": ", ".join(f"#{field}" for field in ADMIN_USER_FIELDS),
+        "ExpressionAttributeNames": {f"#{field}": field for field in ADMIN_USER_FIELDS},
+        "FilterExpression": Attr("isVeteran").eq(True),
+    }
+
+def admin_user_row(user_data: dict) -> dict:
+    row = {field: user_data.get(field) for field in ADMIN_USER_FIELDS}
+    row["interests"] = user_data.get("interests", [])
+    row["isVeteran"] = user_data.get("isVeteran", False)
+    return row
+
 @router.get("/admin/all", response_model=List[UserResponse])
-async def get_all_users(user: dict = Depends(login_manager)):
+async def get_all_users(
+    response: Response,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of users to scan for this page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    user: dict = Depends(login_manager)
+):
     """
-    Retrieve all users in the system.
+    Retrieve one page of the users in the system.
     Only admin users can access this endpoint.
-    Returns only veteran users.
+    Returns only veteran users, so a page can hold fewer than `limit` users
+    (even none) while more pages follow. The cursor for the next page is
+    returned in the X-Next-Cursor header; see /admin/export for all users at once.
     """
+    require_admin(user)
     try:
-        # Comment out admin check for development
-        # admin_response = admins_table.get_item(Key={'email': user.get('email', '')})
-        # if 'Item' not in admin_response:
-        #     raise HTTPException(status_code=403, detail="Access forbidden. Admin privileges required.")
-        
-        # Scan the users table to get all users
-        response = users_table.scan()
-        users = response.get('Items', [])
-        
-        # Handle pagination if there are more results
-        while 'LastEvaluatedKey' in response:
-            response = users_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            users.extend(response.get('Items', []))
-        
-        # Format user data to match response model, filtering for veterans only
-        formatted_users = []
-        for user_data in users:
-            # Only include users where isVeteran is True
-            if user_data.get("isVeteran", False):
-                formatted_user = {
-                    "username": user_data.get("username"),
-                    "firstName": user_data.get("firstName"),
-                    "lastName": user_data.get("lastName"),
-                    "email": user_data.get("email"),
-                    "phoneNumber": user_data.get("phoneNumber"),
-                    "interests": user_data.get("interests", []),
-                    "isVeteran": user_data.get("isVeteran", False),
-                    "profilePic": user_data.get("profilePic"),
-                    "employmentStatus": user_data.get("employmentStatus"),
-                    "workLocation": user_data.get("workLocation"),
-                    "liveState": user_data.get("liveState"),
-                    "liveLocation": user_data.get("liveLocation"),
-                    "height": user_data.get("height"),
-                    "weight": user_data.get("weight")
-                }
-                formatted_users.append(formatted_user)
-            
-        logger.info(f"Retrieved {len(formatted_users)} veteran users from database")
-        return formatted_users
+        result = await users_table.scan(**admin_users_scan_kwargs(), **page_kwargs(limit, cursor))
+        set_next_cursor(response, result)
+        return [admin_user_row(user_data) for user_data in result.get("Items", [])]
     except ClientError as e:
         logger.error(f"Failed to retrieve users from DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve users.")
 
+def csv_line(values: list) -> str:
+    line = io.StringIO()
+    csv.writer(line).writerow(values)
+    return line.getvalue()
+
+async def export_lines(file_format: str):
+    if file_format == "csv":
+        yield csv_line(ADMIN_USER_FIELDS)
+    pages = users_table.parallel_scan(EXPORT_SEGMENTS, Limit=EXPORT_PAGE_SIZE, **admin_users_scan_kwargs())
+    async for page in pages:
+        lines = []
+        for user_data in page:
+            row = jsonable_encoder(admin_user_row(user_data))
+            if file_format == "csv":
+                row["interests"] = ";".join(row["interests"] or [])
+                lines.append(csv_line([row[field] for field in ADMIN_USER_FIELDS]))
+            else:
+                lines.append(json.dumps(row) + "\n")
+        yield "".join(lines)
+
+@router.get("/admin/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson (one JSON user per line) or csv"),
+    user: dict = Depends(login_manager)
+):
+    """
+    Stream every veteran user as NDJSON or CSV.
+    Only admin users can access this endpoint.
+    Rows are sent as the table is scanned, in no particular order.
+    """
+    require_admin(user)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_lines(format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
+
 @router.post("/forgot-password")
 async def forgot_password(request: ForgotPasswordRequest):
     """Request password reset - send email with reset token"""
@@ -402,7 +655,7 @@ async def forgot_password(request: ForgotPasswordRequest):
         normalized_email = request.email.lower().strip()
         
         # Find user by email using the email index
-        response = users_table.query(
+        response = await users_table.query(
             IndexName='email-index',
             KeyConditionExpression=Key('email').eq(normalized_email)
         )
@@ -417,19 +670,8 @@ async def forgot_password(request: ForgotPasswordRequest):
         user = response['Items'][0]
         username = user['username']
         
-        # Generate secure reset token
-        reset_token = secrets.token_urlsafe(32)
-        token_expiry = datetime.utcnow() + timedelta(hours=1)  # 1 hour expiry
-        
-        # Store reset token in database
-        users_table.update_item(
-            Key={'username': username},
-            UpdateExpression='SET password_reset_token = :token, password_reset_expiry = :expiry',
-            ExpressionAttributeValues={
-                ':token': reset_token,
-                ':expiry': token_expiry.isoformat()
-            }
-        )
+        # Generate secure reset token (1 hour expiry) and store its hash
+        reset_token = await issue_token(username, RESET_PASSWORD)
         
         # Send reset email
         email_sent = await send_password_reset_email(normalized_email, reset_token, username)
@@ -453,45 +695,48 @@ async def forgot_password(request: ForgotPasswordRequest):
 async def reset_password(request: ResetPasswordRequest):
     """Reset password using valid token - SECURE VERSION using request body"""
     try:
-        # Find user with this reset token
-        response = users_table.scan(
-            FilterExpression=Attr('password_reset_token').eq(request.token)
-        )
-        
-        if not response['Items']:
+        # Look up the reset token
+        token_item = await find_token(request.token, RESET_PASSWORD)
+        if token_item is None:
             raise HTTPException(
                 status_code=400, 
                 detail="Invalid or expired reset token"
             )
         
-        user = response['Items'][0]
-        
         # Check if token is expired
-        if 'password_reset_expiry' in user:
-            expiry = datetime.fromisoformat(user['password_reset_expiry'])
-            if datetime.utcnow() > expiry:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Reset token has expired. Please request a new one."
-                )
+        if token_expired(token_item):
+            raise HTTPException(
+                status_code=400, 
+                detail="Reset token has expired. Please request a new one."
+            )
         
         # Hash the new password
-        hashed_password = get_password_hash(request.new_password)
+        hashed_password = await get_password_hash(request.new_password)
         
-        # Update password and remove reset token
-        users_table.update_item(
-            Key={'username': user['username']},
-            UpdateExpression='SET password = :password REMOVE password_reset_token, password_reset_expiry',
+        # Use up the reset token, then update the password
+        if not await consume_token(token_item):
+            raise HTTPException(
+                status_code=400, 
+                detail="Invalid or expired reset token"
+            )
+        username = token_item['username']
+        await users_table.update_item(
+            Key={'username': username},
+            # Bumping tokenVersion signs the user out of every session
+            UpdateExpression='SET password = :password ADD tokenVersion :one',
+            ConditionExpression='attribute_exists(username)',
             ExpressionAttributeValues={
-                ':password': hashed_password
+                ':password': hashed_password,
+                ':one': 1
             }
         )
+        invalidate_user(username)
         
-        logger.info(f"Password successfully reset for user: {user['username']}")
+        logger.info(f"Password successfully reset for user: {username}")
         
         return {
             "message": "Password has been reset successfully. You can now log in with your new password.",
-            "username": user['username']
+            "username": username
         }
         
     except HTTPException:
@@ -505,24 +750,17 @@ async def reset_password(request: ResetPasswordRequest):
 async def verify_reset_token(token: str):
     """Verify if a password reset token is valid (for frontend validation)"""
     try:
-        response = users_table.scan(
-            FilterExpression=Attr('password_reset_token').eq(token)
-        )
-        
-        if not response['Items']:
+        token_item = await find_token(token, RESET_PASSWORD)
+        if token_item is None:
             return {"valid": False, "message": "Invalid token"}
         
-        user = response['Items'][0]
-        
         # Check if token is expired
-        if 'password_reset_expiry' in user:
-            expiry = datetime.fromisoformat(user['password_reset_expiry'])
-            if datetime.utcnow() > expiry:
-                return {"valid": False, "message": "Token expired"}
+        if token_expired(token_item):
+            return {"valid": False, "message": "Token expired"}
         
         return {
             "valid": True, 
-            "username": user['username']
+            "username": token_item['username']
         }
         
     except Exception as e:
@@ -561,10 +799,13 @@ async def admin_update_user(
         #     raise HTTPException(status_code=403, detail="Access forbidden. Admin privileges required.")
             
         # Check if the user to update exists
-        response = users_table.get_item(Key={"username": username})
+        response = await users_table.get_item(Key={"username": username})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="User not found.")
 
+        if email is not None:
+            email = email.lower()
+
         update_expression = "SET "
         expression_attribute_values = {}
 
@@ -600,15 +841,13 @@ async def admin_update_user(
         if not expression_attribute_values:
             return {"message": "No fields to update."}
 
-        users_table.update_item(
-            Key={"username": username},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values,
+        # Update and get the updated user data
+        updated_user = await save_user_update(
+            username, update_expression, expression_attribute_values,
+            response['Item'].get('email'), email
         )
-
-        # Fetch the updated user data
-        updated_response = users_table.get_item(Key={"username": username})
-        updated_user = updated_response['Item']
+        index_user(updated_user)
+        invalidate_user(username)
 
         # Return the updated user data as a UserResponse object
         return UserResponse(
@@ -627,6 +866,9 @@ async def admin_update_user(
             profilePic=updated_user.get("profilePic"),
         )
     except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            # Deleted since the check above
+            raise HTTPException(status_code=404, detail="User not found.")
         logger.error(f"Failed to update user in DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Failed to update user.")
     except ValueError as e:
@@ -647,7 +889,7 @@ async def admin_delete_user(username: str, user: dict = Depends(login_manager)):
         #     raise HTTPException(status_code=403, detail="Access forbidden. Admin privileges required.")
         
         # Check if the user to delete exists
-        response = users_table.get_item(Key={"username": username})
+        response = await users_table.get_item(Key={"username": username})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="User not found.")
         
@@ -657,7 +899,12 @@ async def admin_delete_user(username: str, user: dict = Depends(login_manager)):
             delete_image(user_item["profilePic"], "profile-pictures")
         
         # Delete the user
-        users_table.delete_item(Key={"username": username})
+        deleted = await users_table.delete_item(Key={"username": username}, ReturnValues="ALL_OLD")
+        unindex_user(username)
+        invalidate_user(username)
+        if "Attributes" in deleted:
+            await add_to_user_count(-1)
+            await release_email(username, deleted["Attributes"].get("email"))
         return {"message": f"User {username} deleted successfully."}
     except ClientError as e:
         logger.error(f"Failed to delete user from DynamoDB: {e}")
@@ -672,7 +919,7 @@ async def get_user_picture(username: str):
     """
     try:
         logger.info(f"Fetching user data for: {username}")
-        response = users_table.get_item(Key={"username": username})
+        response = await users_table.get_item(Key={"username": username})
         if "Item" not in response:
             raise HTTPException(status_code=404, detail="User not found.")
         
@@ -692,7 +939,7 @@ async def get_other_user(username: str, user: dict = Depends(login_manager)):
     Retrieve user information for the specified username.
     """
     # Fetch user from DynamoDB
-    table_result = users_table.get_item(Key={"username": username})
+    table_result = await users_table.get_item(Key={"username": username})
     
     user_data = table_result.get("Item")
 
@@ -727,47 +974,31 @@ async def get_other_user(username: str, user: dict = Depends(login_manager)):
     return public_user_info
 
 @router.get("/{logged_in_user}/search")
-def search_users(logged_in_user: str, query: str = None):
+async def search_users(
+    logged_in_user: str,
+    query: str = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of users to return")
+):
+    """
+    Search users by username and name from the in-memory index, best matches
+    first. Without a query, suggest users sharing the most interests with the
+    logged in user, padded with other users up to MIN_SUGGESTIONS.
+    """
     try:
         if query:
-            # Perform a scan on DynamoDB to find users matching the query
-            query = query.split(" ")
-            filter_expression = None
-            for term in query:
-                term_filter = (Attr("username").contains(term.lower()) |
-                            Attr("firstName").contains(term.lower()) |
-                            Attr("lastName").contains(term.lower()))
-                filter_expression = term_filter if filter_expression is None else filter_expression | term_filter
-
-            if not filter_expression:
-                return []
-            response = users_table.scan(FilterExpression=filter_expression)
-            users = response.get("Items", [])
-
-            return users
+            users = user_search_index.search(query, limit)
+            return [{field: user.get(field) for field in USER_RESULT_FIELDS} for user in users]
         else:
-            logged_in_user_data = users_table.get_item(Key={"username": logged_in_user}).get("Item", {})
-            current_user_interests = set(logged_in_user_data.get("interests", []))
-
-            # Scan all users
-            response = users_table.scan()
-            all_users = response.get("Items", [])
-            interest_matches = sorted(
-                [
-                    user for user in all_users 
-                    if (common_interests := set(user.get("interests", [])) & current_user_interests and user.get("username") != logged_in_user)
-                ],
-                key=lambda user: len(set(user.get("interests", [])) & current_user_interests),
-                reverse=True  # Sort in descending order so users with more common interests appear first
+            logged_in_user_data = user_search_index.get(logged_in_user)
+            if logged_in_user_data is None:
+                # Registered through another worker since the last refresh
+                logged_in_user_data = (await users_table.get_item(Key={"username": logged_in_user})).get("Item", {})
+            current_user_interests = logged_in_user_data.get("interests") or []
+
+            matched_usernames = user_interest_index.similar(
+                current_user_interests, limit, exclude=logged_in_user, fill=MIN_SUGGESTIONS
             )
-        
-            non_interest_matches = [user for user in all_users if user not in interest_matches and user.get("username") != logged_in_user]
-
-            # If we have 5 or more interest matches, return all of them
-            if len(interest_matches) >= 5:
-                matched_users = interest_matches
-            else:
-                matched_users = interest_matches + non_interest_matches[:5 - len(interest_matches)]
+            matched_users = [user_search_index.get(username) or {"username": username} for username in matched_usernames]
 
             # Format response
             response_data = []
@@ -796,10 +1027,16 @@ def search_users(logged_in_user: str, query: str = None):
         raise HTTPException(status_code=500, detail="Failed to search users.")
 
 
+@router.get("/{username}/is-admin", response_model=dict)
+async def get_is_admin(username: str):
+    # Declared before /{logged_in_user}/{username}, which would match it too.
+    # Admins are keyed by email, so `username` is an email here
+    return {"isAdmin": admins.is_admin(username)}
+
 @router.get("/{logged_in_user}/{username}")
-def search_users_by_username(username: str, logged_in_user:str):
+async def search_users_by_username(username: str, logged_in_user:str):
     # Scan the DynamoDB table to find users with partial match
-    response = users_table.get_item(Key={"username": username})
+    response = await users_table.get_item(Key={"username": username})
     return RedirectResponse(url=f"/profile/{username}")
 
 # 4. GENERAL USER ROUTES (basic CRUD operations with the same path)
@@ -810,7 +1047,7 @@ async def get_user(username: str, user: dict = Depends(login_manager)):
     Only the authenticated user can access their data.
     """
     response = []
-    table_result = users_table.get_item(Key={"username": username})
+    table_result = await users_table.get_item(Key={"username": username})
     user_data = table_result.get("Item")
 
     if not user_data:
@@ -853,10 +1090,13 @@ async def update_user(
         raise HTTPException(status_code=403, detail="Access forbidden.")
 
     try:
-        response = users_table.get_item(Key={"username": username})
+        response = await users_table.get_item(Key={"username": username})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="User not found.")
 
+        if email is not None:
+            email = email.lower()
+
         update_expression = "SET "
         expression_attribute_values = {}
 
@@ -889,15 +1129,13 @@ async def update_user(
 
         update_expression = update_expression.rstrip(", ")
 
-        users_table.update_item(
-            Key={"username": username},
-            UpdateExpression=update_expression,
-            ExpressionAttributeValues=expression_attribute_values,
+        # Update and get the updated user data
+        updated_user = await save_user_update(
+            username, update_expression, expression_attribute_values,
+            response['Item'].get('email'), email
         )
-
-        # Fetch the updated user data
-        updated_response = users_table.get_item(Key={"username": username})
-        updated_user = updated_response['Item']
+        index_user(updated_user)
+        invalidate_user(username)
 
         # Return the updated user data as a UserResponse object
         return UserResponse(
@@ -916,20 +1154,19 @@ async def update_user(
             profilePic=updated_user.get("profilePic"),
         )
     except ClientError as e:
+        if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+            # Deleted since the check above
+            raise HTTPException(status_code=404, detail="User not found.")
         logger.error(f"Failed to update user in DynamoDB: {e}")
         raise HTTPException(status_code=500, detail="Failed to update user.")
     
-@router.get("/{username}/is-admin", response_model=bool)
-async def get_is_admin(username: str):
-    response = admins_table.get_item(Key={"email": username})
-    return {"isAdmin": "Item" in response}
 
 @router.delete("/{username}", response_model=UserResponse)
 async def delete_user(username: str, user: dict = Depends(login_manager)):
     if user["username"] != username:
         raise HTTPException(status_code=403, detail="Access forbidden.")
     try:
-        response = users_table.get_item(Key={"username": username})
+        response = await users_table.get_item(Key={"username": username})
         if 'Item' not in response:
             raise HTTPException(status_code=404, detail="User not found.")
         
@@ -938,7 +1175,12 @@ async def delete_user(username: str, user: dict = Depends(login_manager)):
         if "profilePic" in user_item:
             delete_image(user_item["profilePic"], "profile-pictures")
 
-        users_table.delete_item(Key={"username": username})
+        deleted = await users_table.delete_item(Key={"username": username}, ReturnValues="ALL_OLD")
+        unindex_user(username)
+        invalidate_user(username)
+        if "Attributes" in deleted:
+            await add_to_user_count(-1)
+            await release_email(username, deleted["Attributes"].get("email"))
         return {"message": "User deleted successfully."}
     except ClientError as e:
         logger.error(f"Failed to delete user from DynamoDB: {e}")
@@ -0,0 +1,50 @@
+from botocore.exceptions import ClientError
+from api.aws_wrappers.dynamo import get_table
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Reload interval of the admin directory, so admins added or removed in the
+# table take effect on every worker
+ADMIN_DIRECTORY_REFRESH_SECONDS = int(os.getenv('ADMIN_DIRECTORY_REFRESH_SECONDS', '300'))
+
+admins_table = get_table('admins')
+
+# Emails of the admins (the admins table's keys); swapped whole on reload
+_admin_emails = frozenset()
+
+
+def is_admin(email: str) -> bool:
+    return bool(email) and email in _admin_emails
+
+def role_for(email: str) -> str:
+    return "admin" if is_admin(email) else "veteran"
+
+async def load_admin_directory():
+    """
+    Reload the admin emails from the admins table. Keeps the previous set
+    if the table cannot be read. Call after changing the admins table to
+    apply the change on this worker right away.
+    """
+    global _admin_emails
+    emails = set()
+    kwargs = {}
+    try:
+        while True:
+            result = await admins_table.scan(ProjectionExpression="email", **kwargs)
+            emails.update(item["email"] for item in result.get("Items", []))
+            if "LastEvaluatedKey" not in result:
+                break
+            kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+    except ClientError as e:
+        logger.error(f"Failed to load the admin directory: {e}")
+        return
+    _admin_emails = frozenset(emails)
+    logger.info(f"Admin directory loaded with {len(emails)} admins")
+
+async def refresh_admin_directory():
+    while True:
+        await asyncio.sleep(ADMIN_DIRECTORY_REFRESH_SECONDS)
+        await load_admin_directory()
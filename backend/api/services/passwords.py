@@ -0,0 +1,88 @@
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+# bcrypt takes 100-300 ms of CPU per hash, so it runs in worker processes
+# instead of on the event loop (threads would still contend for the GIL)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+# Hashes handed to the pool at once; further requests wait their turn here
+PASSWORD_HASH_CONCURRENCY = int(os.getenv('PASSWORD_HASH_CONCURRENCY', str(2 * PASSWORD_HASH_WORKERS)))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphore = asyncio.Semaphore(PASSWORD_HASH_CONCURRENCY)
+_stats = {
+    'waiting': 0,
+    'in_pool': 0,
+    'max_queue_depth': 0,
+    'completed': 0,
+}
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a process that runs threads and an event loop is unsafe
+            _executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def queue_depth() -> int:
+    # Requests waiting for a turn plus those queued inside the pool behind busy workers
+    return _stats['waiting'] + max(0, _stats['in_pool'] - PASSWORD_HASH_WORKERS)
+
+def stats() -> dict:
+    return {
+        'workers': PASSWORD_HASH_WORKERS,
+        'concurrency': PASSWORD_HASH_CONCURRENCY,
+        'queueDepth': queue_depth(),
+        'maxQueueDepth': _stats['max_queue_depth'],
+        'inPool': _stats['in_pool'],
+        'completed': _stats['completed'],
+    }
+
+async def _run(func, *args):
+    _stats['waiting'] += 1
+    _stats['max_queue_depth'] = max(_stats['max_queue_depth'], queue_depth())
+    try:
+        await _semaphore.acquire()
+    finally:
+        _stats['waiting'] -= 1
+    _stats['in_pool'] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+    finally:
+        _stats['in_pool'] -= 1
+        _stats['completed'] += 1
+        _semaphore.release()
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await _run(_verify, plain_password, hashed_password)
@@ -0,0 +1,65 @@
+"""
+Concurrent-request throughput of a handler that reads DynamoDB, before and
+after moving the boto3 call onto the shared executor (api.aws_wrappers.dynamo).
+
+The table is simulated with a fixed network latency so the numbers do not
+depend on AWS. Run from the backend directory:
+
+    python -m benchmarks.bench_async_dynamo --requests 200 --latency-ms 20
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("aws_region", "us-east-1")
+
+from api.aws_wrappers.dynamo import AsyncTable  # noqa: E402
+
+
+class SlowTable:
+    """Stands in for a boto3 Table whose calls take one network round trip."""
+
+    name = "bench"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def get_item(self, **kwargs):
+        time.sleep(self.latency)
+        return {"Item": kwargs["Key"]}
+
+
+async def blocking_handler(table: SlowTable, i: int):
+    # What the routers did before: call boto3 directly inside `async def`
+    return table.get_item(Key={"username": f"user{i}"})
+
+
+async def executor_handler(table: AsyncTable, i: int):
+    return await table.get_item(Key={"username": f"user{i}"})
+
+
+async def measure(handler, table, requests: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(table, i) for i in range(requests)))
+    return time.perf_counter() - start
+
+
+async def main(requests: int, latency_ms: float):
+    table = SlowTable(latency_ms / 1000)
+
+    before = await measure(blocking_handler, table, requests)
+    after = await measure(executor_handler, AsyncTable(table), requests)
+
+    print(f"{requests} concurrent requests, {latency_ms:.0f} ms per DynamoDB call")
+    print(f"  blocking boto3 : {before:8.3f} s  {requests / before:10.1f} req/s")
+    print(f"  async executor : {after:8.3f} s  {requests / after:10.1f} req/s")
+    print(f"  speedup        : {before / after:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
@@ -0,0 +1,84 @@
+"""
+Latency of unrelated requests during a burst of logins, with bcrypt run on
+the event loop (as the users router used to) and in the password hashing
+process pool (api.services.passwords).
+
+The unrelated request is a handler that does no work: its latency is how
+long it waits for the event loop. Run from the backend directory:
+
+    python -m benchmarks.bench_login_storm --logins 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("aws_region", "us-east-1")
+
+from api.services import passwords  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+# Interval between unrelated requests
+PROBE_INTERVAL = 0.005
+
+
+async def blocking_login(hashed: str):
+    # What the users router did before: bcrypt inside `async def`
+    return passwords.pwd_context.verify(PASSWORD, hashed)
+
+
+async def pooled_login(hashed: str):
+    return await passwords.verify_password(PASSWORD, hashed)
+
+
+async def probe(latencies: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def measure(login, hashed: str, logins: int):
+    latencies = []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(latencies, stop))
+    await asyncio.sleep(0.1)
+    start = time.perf_counter()
+    if login is not None:
+        await asyncio.gather(*(login(hashed) for _ in range(logins)))
+    else:
+        await asyncio.sleep(0.5)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await prober
+    return elapsed, latencies
+
+
+async def main(logins: int):
+    hashed = passwords.pwd_context.hash(PASSWORD)
+    # Start the pool's processes before timing
+    await asyncio.gather(*(pooled_login(hashed) for _ in range(passwords.PASSWORD_HASH_WORKERS)))
+
+    print(f"{logins} concurrent logins, {passwords.PASSWORD_HASH_WORKERS} hashing workers")
+    print(f"  {'':14} {'total':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, login in [("idle", None), ("event loop", blocking_login), ("process pool", pooled_login)]:
+        elapsed, latencies = await measure(login, hashed, logins)
+        print(
+            f"  {name:14} {elapsed:8.2f}s {statistics.median(latencies):8.1f}"
+            f" {percentile(latencies, 99):8.1f} {max(latencies):8.1f}"
+        )
+    print(f"  pool stats: {passwords.stats()}")
+    passwords.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
@@ -0,0 +1,76 @@
+"""
+Startup-time report for the API import path: how long `import api.main`
+takes and whether it tries to open any network connection (it should not;
+NLTK corpora used to be downloaded here). Run from the backend directory:
+
+    python -m benchmarks.startup_report
+
+Exits with status 1 if any connection or DNS lookup was attempted.
+Placeholder AWS credentials are set when none are configured, as every
+deployment has them; otherwise boto3 would look them up from the EC2
+instance metadata service while the clients are created.
+"""
+import os
+import socket
+import sys
+import time
+
+for name, value in [
+    ("aws_region", "us-east-1"),
+    ("aws_access_key_id", "placeholder"),
+    ("aws_secret_access_key", "placeholder"),
+    ("AWS_ACCESS_KEY_ID", "placeholder"),
+    ("AWS_SECRET_ACCESS_KEY", "placeholder"),
+]:
+    os.environ.setdefault(name, value)
+
+attempts = []
+
+_connect = socket.socket.connect
+_connect_ex = socket.socket.connect_ex
+_getaddrinfo = socket.getaddrinfo
+
+
+def _record_connect(self, address):
+    attempts.append(("connect", address))
+    return _connect(self, address)
+
+
+def _record_connect_ex(self, address):
+    attempts.append(("connect", address))
+    return _connect_ex(self, address)
+
+
+def _record_getaddrinfo(host, *args, **kwargs):
+    attempts.append(("getaddrinfo", host))
+    return _getaddrinfo(host, *args, **kwargs)
+
+
+def main() -> int:
+    socket.socket.connect = _record_connect
+    socket.socket.connect_ex = _record_connect_ex
+    socket.getaddrinfo = _record_getaddrinfo
+    try:
+        start = time.perf_counter()
+        import api.main  # noqa: F401
+        import_time = time.perf_counter() - start
+
+        from api.nlp.stopwords import load_stopwords
+        start = time.perf_counter()
+        stop_words = load_stopwords()
+        stopwords_time = time.perf_counter() - start
+    finally:
+        socket.socket.connect = _connect
+        socket.socket.connect_ex = _connect_ex
+        socket.getaddrinfo = _getaddrinfo
+
+    print(f"import api.main   : {import_time * 1000:8.1f} ms")
+    print(f"load stopwords    : {stopwords_time * 1000:8.3f} ms ({len(stop_words)} words)")
+    print(f"network attempts  : {len(attempts)}")
+    for kind, target in attempts:
+        print(f"  {kind}: {target}")
+    return 1 if attempts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
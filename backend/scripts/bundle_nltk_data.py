@@ -0,0 +1,36 @@
+"""
+Download the NLTK corpora the API can use into a local directory, so a
+deployment can ship them instead of fetching anything at runtime.
+Run from the backend directory:
+
+    python -m scripts.bundle_nltk_data --dir nltk_data
+
+then start the API with NLTK_DATA pointing at that directory. Without it
+the vendored stopword list in api/nlp/stopwords.py is used.
+"""
+import argparse
+import os
+import sys
+
+import nltk
+
+# Corpora read by api.nlp
+CORPORA = ["stopwords"]
+
+
+def main(directory: str) -> int:
+    os.makedirs(directory, exist_ok=True)
+    failed = [name for name in CORPORA if not nltk.download(name, download_dir=directory, quiet=True)]
+    if failed:
+        print(f"Failed to download: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    print(f"Bundled {', '.join(CORPORA)} into {os.path.abspath(directory)}")
+    print(f"Set NLTK_DATA={os.path.abspath(directory)} to use it.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dir", default="nltk_data")
+    args = parser.parse_args()
+    sys.exit(main(args.dir))
@@ -109,12 +109,26 @@ interface Comment {
 	content: string;
 }
 
-export const getCommentData = async (postId: string) => {
+export interface CommentsPage {
+	comments: Comment[];
+	nextCursor: string | null;
+}
+
+// One page of a post's comments, oldest first; pass the previous page's
+// nextCursor to get the page after it
+export const getCommentData = async (
+	postId: string,
+	cursor?: string
+): Promise<CommentsPage> => {
 	try {
 		const response = await api.get<Comment[]>(
-			`${API_URL}/comments/${postId}`
+			`${API_URL}/comments/${postId}`,
+			{ params: { cursor } }
 		);
-		return response.data; // Return the fetched comments
+		return {
+			comments: response.data, // Return the fetched comments
+			nextCursor: response.headers["x-next-cursor"] || null,
+		};
 	} catch (error) {
 		console.error("Failed to fetch comments:", error);
 		throw error; // Rethrow error for caller to handle
@@ -128,7 +142,7 @@ interface Post {
 	topics: string[];
 	images: string[];
 	likes: number;
-	likedBy: string[];
+	isLiked: boolean;
 	timestamp: string;
 }
 
@@ -138,10 +152,12 @@ export const getFilteredTopics = async (
 ) => {
 	try {
 		const encodedTopics = selectedTopics.join(",");
+		const token = localStorage.getItem("authToken");
 		const response = await api.get<Post[]>(
 			`${API_URL}/posts/filter/topics`,
 			{
 				params: { topics: encodedTopics },
+				headers: token ? { Authorization: `Bearer ${token}` } : {},
 			}
 		);
 
@@ -224,17 +240,44 @@ export type GroupData = {
 	}[];
 };
 
-// Get all groups
-export const getGroupsData = async (): Promise<GroupData[]> => {
+// One page of the group directory (summaries, without posts)
+export type GroupSummaryData = {
+	groupId: string;
+	name: string;
+	description: string;
+	author: string;
+	image: string;
+	postCount?: number;
+};
+
+export interface GroupsPage {
+	groups: GroupSummaryData[];
+	nextCursor: string | null;
+}
+
+// useSWRInfinite key of each directory page; the cursor of the next page
+// comes in the X-Next-Cursor header of the previous one
+export const getGroupsPageKey = (pageIndex: number, previousPage: GroupsPage | null) => {
+	if (pageIndex === 0) {
+		return `${API_URL}/groups/`;
+	}
+	if (!previousPage?.nextCursor) {
+		return null;
+	}
+	return `${API_URL}/groups/?cursor=${encodeURIComponent(previousPage.nextCursor)}`;
+};
+
+export const getGroupsPage = async (url: string): Promise<GroupsPage> => {
 	try {
-		const response = await api.get(`${API_URL}/groups/`, {
+		const response = await api.get(url, {
 			headers: {
 				"Content-Type": "application/json",
 			},
 		});
-
-		// console.log(response.data);
-		return response.data;
+		return {
+			groups: response.data,
+			nextCursor: response.headers["x-next-cursor"] || null,
+		};
 	} catch (error: any) {
 		console.error("Error fetching groups data:", error.message);
 		throw new Error(
@@ -517,21 +560,30 @@ export const getOtherUserData = async ({
 	}
 };
 
-export const getAllUsers = async (): Promise<any[]> => {
+// Fetch every user page by page, following the X-Next-Cursor header.
+// onPage is called with each page as soon as it arrives.
+export const getAllUsers = async (
+	onPage?: (users: any[]) => void
+): Promise<any[]> => {
 	try {
 		const token = localStorage.getItem("authToken");
-		const response = await api.get(
-			`${API_URL}/users/admin/all`,
-			{
+		const users: any[] = [];
+		let cursor: string | undefined;
+		do {
+			const response = await api.get(`${API_URL}/users/admin/all`, {
+				params: { limit: 100, cursor },
 				headers: {
 					Authorization: `Bearer ${token}`,
 				},
 				withCredentials: true,
-			}
-		);
+			});
+			users.push(...response.data);
+			onPage?.(response.data);
+			cursor = response.headers["x-next-cursor"] || undefined;
+		} while (cursor);
 
 		// Return the list of users
-		return response.data;
+		return users;
 	} catch (error: unknown) {
 		console.error("Error fetching all users:", error);
 		const message =
@@ -86,7 +86,6 @@ export const putUserData = async ({
 
 type UpdatePostParams = {
 	content?: string;
-	likes?: number;
 	topics?: string[];
 	images?: string[];
 	likedBy?: string[];
@@ -108,9 +107,6 @@ export const putPostData = async (
 		if (updateFields.content) {
 			payload.content = updateFields.content;
 		}
-		if (updateFields.likes !== undefined) {
-			payload.likes = updateFields.likes;
-		}
 		if (updateFields.topics) {
 			payload.topics = updateFields.topics;
 		}
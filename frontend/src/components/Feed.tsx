@@ -1,5 +1,5 @@
-import useSWR from "swr";
-import { useState, useEffect } from "react";
+import useSWRInfinite from "swr/infinite";
+import { useState, useEffect, useMemo } from "react";
 import { getFilteredTopics, getTrendingData } from "../Api/getData";
 import { deletePostData } from "../Api/deleteData";
 import {
@@ -32,11 +32,41 @@ interface Post {
 	topics: string[];
 	images: string[];
 	likes: number;
-	likedBy: string[];
+	isLiked: boolean;
 	timestamp: string;
 }
 
-const fetcher = (url: string) => api.get(url).then((res) => res.data);
+interface PostsPage {
+	posts: Post[];
+	nextCursor: string | null;
+}
+
+const sortByNewest = (posts: Post[]) =>
+	[...posts].sort(
+		(a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
+	);
+
+// Send the token when logged in, so posts come back with isLiked set for this user.
+// The feed comes in pages; the cursor of the next page is in the X-Next-Cursor header
+const pageFetcher = (url: string): Promise<PostsPage> => {
+	const token = localStorage.getItem("authToken");
+	return api
+		.get(url, token ? { headers: { Authorization: `Bearer ${token}` } } : {})
+		.then((res) => ({
+			posts: res.data,
+			nextCursor: res.headers["x-next-cursor"] || null,
+		}));
+};
+
+const getPageKey = (pageIndex: number, previousPage: PostsPage | null) => {
+	if (pageIndex === 0) {
+		return `${API_URL}/posts/`;
+	}
+	if (!previousPage?.nextCursor) {
+		return null;
+	}
+	return `${API_URL}/posts/?cursor=${encodeURIComponent(previousPage.nextCursor)}`;
+};
 
 // const fetcher = async (url: string) => {
 //   console.log('Fetching URL:', url);
@@ -49,10 +79,16 @@ const fetcher = (url: string) => api.get(url).then((res) => res.data);
 const Feed = () => {
 	const toast = useToast();
 	const {
-		data: posts,
+		data: pages,
 		error,
 		mutate,
-	} = useSWR<Post[]>(`${API_URL}/posts/`, fetcher);
+		size,
+		setSize,
+	} = useSWRInfinite<PostsPage>(getPageKey, pageFetcher);
+	const posts = useMemo(() => pages?.flatMap((page) => page.posts), [pages]);
+	const hasMorePosts = Boolean(pages?.[pages.length - 1]?.nextCursor);
+	const isLoadingMore = Boolean(pages) && pages!.length < size;
+	const [isFiltered, setIsFiltered] = useState(false);
 	const [selectedTopics, setSelectedTopics] = useState<string[]>([]);
 	const [activePosts, setActivePosts] = useState<Post[]>([]);
 	const [isLoadingTrending, setIsLoadingTrending] = useState(true);
@@ -72,10 +108,8 @@ const Feed = () => {
 		try {
 			if (selectedTopics.length === 0) {
 				// If no topics selected, show all posts sorted
-				const sortedPosts = [...(posts || [])].sort((a, b) => {
-					return new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime();
-				});
-				setActivePosts(sortedPosts);
+				setActivePosts(sortByNewest(posts || []));
+				setIsFiltered(false);
 				return;
 			}
 
@@ -84,6 +118,7 @@ const Feed = () => {
 				return new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime();
 			});
 			setActivePosts(sortedFilteredPosts);
+			setIsFiltered(true);
 		} catch (error: any) {
 			console.error("Error fetching filtered posts:", error);
 			toast({
@@ -99,26 +134,19 @@ const Feed = () => {
 	// Sort posts when they're loaded or filtered
 	useEffect(() => {
 		if (posts) {
-			setActivePosts(
-				[...posts].sort(
-					(a, b) => new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
-				)
-			);
+			setActivePosts(sortByNewest(posts));
+			setIsFiltered(false);
 		}
 	}, [posts]);
 
 	const handleMutate = async () => {
 		try {
-			const updatedPosts = await mutate(async () => {
-				const response = await fetcher(`${API_URL}/posts/`);
-				return response.sort(
-					(a: Post, b: Post) =>
-						new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
-				);
-			}, false);
+			// Refetches every page loaded so far
+			const updatedPages = await mutate();
 
-			if (updatedPosts) {
-				setActivePosts(updatedPosts);
+			if (updatedPages) {
+				setActivePosts(sortByNewest(updatedPages.flatMap((page) => page.posts)));
+				setIsFiltered(false);
 			}
 		} catch (error) {
 			console.error("Error fetching new posts:", error);
@@ -285,7 +313,7 @@ const Feed = () => {
 										topics={post.topics}
 										images={post.images}
 										likes={post.likes}
-										likedBy={post.likedBy || []}
+										isLiked={post.isLiked ?? false}
 										onDelete={handleDeletePost}
 									/>
 								</Box>
@@ -301,6 +329,17 @@ const Feed = () => {
 								<Text color={mutedTextColor}>No posts available.</Text>
 							</Box>
 						)}
+						{hasMorePosts && !isFiltered && (
+							<Button
+								onClick={() => setSize(size + 1)}
+								isLoading={isLoadingMore}
+								bgColor={buttonBgColor}
+								color="white"
+								_hover={{ bgColor: buttonHoverColor }}
+							>
+								Load more posts
+							</Button>
+						)}
 					</VStack>
 				</Box>
 
@@ -34,6 +34,8 @@ const GroupPost: React.FC<GroupPostProps> = ({ groupId, postId, author, content,
   const [comments, setComments] = useState<Comment[]>([]);
   const [newComment, setNewComment] = useState("");
   const [loadingComments, setLoadingComments] = useState(false);
+  const [commentsCursor, setCommentsCursor] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
   const [isLiked, setIsLiked] = useState(likedBy?.includes(username ?? '') || false);
   const [authorProfilePic, setAuthorProfilePic] = useState<string>('');
   const [userProfilePic, setUserProfilePic] = useState<string>('');
@@ -123,23 +125,33 @@ const GroupPost: React.FC<GroupPostProps> = ({ groupId, postId, author, content,
     }
   };
 
-  // Fetch comments when the component mounts
+  // Fetch one page of comments and append it (comments added here meanwhile are skipped)
+  const fetchCommentsPage = async (cursor?: string) => {
+    const page = await getCommentData(postId, cursor);
+    // TODO: speed up comment pfp fetching
+    const commentsWithPfp = await Promise.all(
+      page.comments.map(async (comment) => {
+        const res = await getUserProfilePic(comment.author!);
+        return {
+          ...comment,
+          profilePic: res,
+        };
+      })
+    );
+    setComments((prev) => {
+      const shown = new Set(prev.map((c) => c.commentId));
+      return [...prev, ...commentsWithPfp.filter((c) => !shown.has(c.commentId))];
+    });
+    setCommentsCursor(page.nextCursor);
+  };
+
+  // Fetch the first page of comments when the component mounts
   useEffect(() => {
     const fetchComments = async () => {
       setLoadingComments(true);
+      setComments([]);
       try {
-        const fetchedComments = await getCommentData(postId);
-        // TODO: speed up comment pfp fetching
-        const commentsWithPfp = await Promise.all(
-          fetchedComments.map(async (comment) => {
-            const res = await getUserProfilePic(comment.author!);
-            return {
-              ...comment,
-              profilePic: res,
-            };
-          })
-        );
-        setComments(commentsWithPfp);
+        await fetchCommentsPage();
       } catch (error) {
         console.error("Failed to fetch comments:", error);
       } finally {
@@ -150,6 +162,18 @@ const GroupPost: React.FC<GroupPostProps> = ({ groupId, postId, author, content,
     fetchComments();
   }, [postId]);
 
+  const handleShowMoreComments = async () => {
+    if (!commentsCursor) return;
+    setLoadingMoreComments(true);
+    try {
+      await fetchCommentsPage(commentsCursor);
+    } catch (error) {
+      console.error("Failed to fetch comments:", error);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   const handleAddComment = async () => {
     if (!newComment.trim()) return;
 
@@ -291,6 +315,17 @@ const GroupPost: React.FC<GroupPostProps> = ({ groupId, postId, author, content,
         ) : (
           <Text color={subtleColor}>No comments yet.</Text>
         )}
+        {commentsCursor && !loadingComments && (
+          <Button
+            size="sm"
+            variant="ghost"
+            onClick={handleShowMoreComments}
+            isLoading={loadingMoreComments}
+            color={textColor}
+          >
+            Show more comments
+          </Button>
+        )}
       </VStack>
       
     </Box>
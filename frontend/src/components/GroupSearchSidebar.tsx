@@ -1,5 +1,5 @@
-import { useRef, useState, useEffect } from "react";
-import useSWR from "swr";
+import { useRef, useState, useEffect, useMemo } from "react";
+import useSWRInfinite from "swr/infinite";
 import {
 	Box,
 	Input,
@@ -24,17 +24,12 @@ import {
 import { Search, Plus, Trash2 } from "react-feather";
 import { useAuth } from "../Auth/Auth";
 import { postGroupData } from "../Api/postData";
-import { getSearchGroupsData } from "../Api/getData";
+import { getGroupsPage, getGroupsPageKey, getSearchGroupsData, GroupsPage } from "../Api/getData";
 import { putGroupInfoData } from "../Api/putData";
 import { deleteGroupData } from "../Api/deleteData";
 import { v4 as uuidv4 } from "uuid"; // Import UUID library
 import UpdateGroupModal from "./UpdateGroupModal";
 
-const API_URL = import.meta.env.VITE_API_URL;
-
-// Fetcher function for SWR
-const fetcher = (url: string) => fetch(url).then((res) => res.json());
-
 interface Group {
 	groupId: string;
 	author: string;
@@ -44,7 +39,7 @@ interface Group {
 }
 
 interface GroupSearchSidebarProps {
-	setGroupId: (groupId: string) => void;
+	setGroupId: (groupId: string, group?: Group) => void;
 	mutate?: () => void;
 }
 
@@ -52,15 +47,19 @@ const GroupSearchSidebar: React.FC<GroupSearchSidebarProps> = ({
 	setGroupId,
 	mutate: externalMutate,
 }) => {
-	// Use SWR for fetching groups (all groups)
-	const { data: allGroups } = useSWR<Group[]>(
-		`${API_URL}/groups`,
-		fetcher
-	);
-	const { mutate: swrMutate } = useSWR<Group[]>(
-		`${API_URL}/groups`,
-		fetcher
+	// Group directory, one page at a time
+	const {
+		data: groupPages,
+		mutate: swrMutate,
+		size,
+		setSize,
+	} = useSWRInfinite<GroupsPage>(getGroupsPageKey, getGroupsPage);
+	const allGroups = useMemo(
+		() => groupPages?.flatMap((page) => page.groups),
+		[groupPages]
 	);
+	const hasMoreGroups = Boolean(groupPages?.[groupPages.length - 1]?.nextCursor);
+	const isLoadingMoreGroups = Boolean(groupPages) && groupPages!.length < size;
 	const mutate = externalMutate || swrMutate;
 
 	const [input, setInput] = useState<string>("");
@@ -470,7 +469,7 @@ const GroupSearchSidebar: React.FC<GroupSearchSidebarProps> = ({
 						<Box
 							key={group.groupId}
 							cursor="pointer"
-							onClick={() => setGroupId(group.groupId)}
+							onClick={() => setGroupId(group.groupId, group)}
 							width="100%"
 							p={3}
 							borderRadius="md"
@@ -534,6 +533,19 @@ const GroupSearchSidebar: React.FC<GroupSearchSidebarProps> = ({
 							</HStack>
 						</Box>
 					))}
+					{hasMoreGroups && !input.trim() && (
+						<Button
+							onClick={() => setSize(size + 1)}
+							isLoading={isLoadingMoreGroups}
+							bg={buttonBgColor}
+							color="white"
+							_hover={{ bg: buttonHoverBgColor }}
+							width="100%"
+							size="sm"
+						>
+							Load more groups
+						</Button>
+					)}
 					{searchResults.length === 0 && !loading && (
 						<Box
 							width="100%"
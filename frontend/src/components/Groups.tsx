@@ -1,10 +1,11 @@
 import React, { useState } from "react";
-import { Box, Grid, VStack, Text, Heading, Icon } from "@chakra-ui/react";
+import { Box, Grid, VStack, Text, Heading, Icon, Button } from "@chakra-ui/react";
 import { Users } from "react-feather";
-import useSWR from "swr";
+import useSWRInfinite from "swr/infinite";
 import GroupSearchSidebar from "./GroupSearchSidebar";
 import GroupPost from "./GroupPost";
 import CreateGroupPostCard from "./CreateGroupPostCard";
+import { getGroupsPage, getGroupsPageKey, GroupsPage } from "../Api/getData";
 import { useColorModeValue } from "@chakra-ui/react";
 
 const API_URL = import.meta.env.VITE_API_URL;
@@ -27,46 +28,78 @@ type Group = {
 	description: string;
 	author: string;
 	image?: string;
-	posts: GroupPostType[];
+	postCount?: number;
 };
 
-// Fetcher function for SWR
-const fetcher = (url: string) => fetch(url).then((res) => res.json());
+interface GroupPostsPage {
+	posts: GroupPostType[];
+	nextCursor: string | null;
+}
+
+// Group posts come in pages, newest first; the cursor of the next page is in
+// the X-Next-Cursor header
+const postsPageFetcher = (url: string): Promise<GroupPostsPage> =>
+	fetch(url).then(async (res) => ({
+		posts: await res.json(),
+		nextCursor: res.headers.get("X-Next-Cursor"),
+	}));
 
 const Groups: React.FC = () => {
 	const [selectedGroupId, setSelectedGroupId] = useState<string | null>(null);
+	// The group as it was clicked, for groups outside the loaded directory pages
+	const [clickedGroup, setClickedGroup] = useState<Group | null>(null);
 
-	// Fetch all groups
-	const { data: groups, mutate } = useSWR<Group[]>(
-		`${API_URL}/groups`,
-		fetcher
+	// Directory pages loaded so far (shared with the sidebar)
+	const { data: groupPages, mutate } = useSWRInfinite<GroupsPage>(
+		getGroupsPageKey,
+		getGroupsPage
 	);
 
-	// Fetch single group when selectedGroupId changes
-	const selectedGroup = groups?.find(
-		(group) => group.groupId === selectedGroupId
-	);
+	// Prefer the loaded directory entry, which is refreshed after edits
+	const selectedGroup =
+		groupPages
+			?.flatMap((page) => page.groups)
+			.find((group) => group.groupId === selectedGroupId) ??
+		(clickedGroup?.groupId === selectedGroupId ? clickedGroup : undefined);
+
+	// Fetch the posts of the selected group, newest page first
+	const getPostsPageKey = (pageIndex: number, previousPage: GroupPostsPage | null) => {
+		if (!selectedGroupId) {
+			return null;
+		}
+		const url = `${API_URL}/groups/${selectedGroupId}/posts?limit=100`;
+		if (pageIndex === 0) {
+			return url;
+		}
+		if (!previousPage?.nextCursor) {
+			return null;
+		}
+		return `${url}&cursor=${encodeURIComponent(previousPage.nextCursor)}`;
+	};
+	const {
+		data: postPages,
+		mutate: mutatePosts,
+		size: postPagesSize,
+		setSize: setPostPagesSize,
+	} = useSWRInfinite<GroupPostsPage>(getPostsPageKey, postsPageFetcher);
+	const posts = postPages?.flatMap((page) => page.posts) ?? [];
+	const hasMorePosts = Boolean(postPages?.[postPages.length - 1]?.nextCursor);
+	const isLoadingMorePosts = Boolean(postPages) && postPages!.length < postPagesSize;
 
-	const handleGroupSelect = (groupId: string) => {
+	const handleGroupSelect = (groupId: string, group?: Group) => {
 		setSelectedGroupId(groupId);
+		setClickedGroup(group ?? null);
 	};
 
 	const handlePostDelete = (postId: string) => {
-		if (selectedGroup) {
-			// Create a new object to avoid direct state mutation
-			const updatedGroup = {
-				...selectedGroup,
-				posts: selectedGroup.posts.filter((post) => post.postId !== postId),
-			};
-
-			// Update the groups array with the modified group
-			const updatedGroups = groups?.map((group) =>
-				group.groupId === selectedGroup.groupId ? updatedGroup : group
-			);
-
-			// Update the SWR cache with the modified data
-			mutate(updatedGroups, false);
-		}
+		// Update the SWR cache without refetching
+		mutatePosts(
+			postPages?.map((page) => ({
+				...page,
+				posts: page.posts.filter((post) => post.postId !== postId),
+			})),
+			false
+		);
 	};
 
 	const bgColor = useColorModeValue("white", "gray.800");
@@ -123,10 +156,10 @@ const Groups: React.FC = () => {
 							</Box>
 							<CreateGroupPostCard
 								groupId={selectedGroup.groupId}
-								mutate={() => mutate()}
+								mutate={() => mutatePosts()}
 							/>
-							{selectedGroup.posts.length > 0 ? (
-								[...selectedGroup.posts]
+							{posts.length > 0 ? (
+								[...posts]
 									.sort(
 										(a, b) =>
 											new Date(b.timestamp).getTime() - new Date(a.timestamp).getTime()
@@ -170,6 +203,16 @@ const Groups: React.FC = () => {
 									</Text>
 								</Box>
 							)}
+							{hasMorePosts && (
+								<Button
+									onClick={() => setPostPagesSize(postPagesSize + 1)}
+									isLoading={isLoadingMorePosts}
+									variant="outline"
+									color={textColor}
+								>
+									Load more posts
+								</Button>
+							)}
 						</VStack>
 					) : (
 						<Box
@@ -14,7 +14,7 @@ interface PostProps {
   topics: string[];
   images: string[];
   likes: number;
-  likedBy: string[];
+  isLiked: boolean;
   isVeteran?: boolean;
   onDelete?: (postId: string) => void;
 }
@@ -27,13 +27,15 @@ interface Comment {
   profilePic: string;
 }
 
-const Post: React.FC<PostProps> = ({ postId, author, content, topics, images, likes, likedBy, onDelete }) => {
+const Post: React.FC<PostProps> = ({ postId, author, content, topics, images, likes, isLiked: initiallyLiked, onDelete }) => {
   const { username } = useAuth();
   const [likeCount, setLikeCount] = useState(likes);
   const [comments, setComments] = useState<Comment[]>([]);
   const [newComment, setNewComment] = useState("");
   const [loadingComments, setLoadingComments] = useState(false);
-  const [isLiked, setIsLiked] = useState(likedBy.includes(username ?? ''));
+  const [commentsCursor, setCommentsCursor] = useState<string | null>(null);
+  const [loadingMoreComments, setLoadingMoreComments] = useState(false);
+  const [isLiked, setIsLiked] = useState(initiallyLiked);
   const [profilePic, setProfilePic] = useState<string>('')
   const [isVeteran, setIsVeteran] = useState<boolean | undefined>(true);
   const toast = useToast();
@@ -93,23 +95,33 @@ const Post: React.FC<PostProps> = ({ postId, author, content, topics, images, li
     }
   };
 
-  // Fetch comments when the component mounts
+  // Fetch one page of comments and append it (comments added here meanwhile are skipped)
+  const fetchCommentsPage = async (cursor?: string) => {
+    const page = await getCommentData(postId, cursor);
+    // TODO: speed up comment pfp fetching
+    const commentsWithPfp = await Promise.all(
+      page.comments.map(async (comment) => {
+        const res = await getUserProfilePic(comment.author!);
+        return {
+          ...comment,
+          profilePic: res,
+        };
+      })
+    );
+    setComments((prev) => {
+      const shown = new Set(prev.map((c) => c.commentId));
+      return [...prev, ...commentsWithPfp.filter((c) => !shown.has(c.commentId))];
+    });
+    setCommentsCursor(page.nextCursor);
+  };
+
+  // Fetch the first page of comments when the component mounts
   useEffect(() => {
     const fetchComments = async () => {
       setLoadingComments(true);
+      setComments([]);
       try {
-        const fetchedComments = await getCommentData(postId);
-        // TODO: speed up comment pfp fetching
-        const commentsWithPfp = await Promise.all(
-          fetchedComments.map(async (comment) => {
-            const res = await getUserProfilePic(comment.author!);
-            return {
-              ...comment,
-              profilePic: res,
-            };
-          })
-        );
-        setComments(commentsWithPfp);
+        await fetchCommentsPage();
       } catch (error) {
         console.error("Failed to fetch comments:", error);
       } finally {
@@ -120,6 +132,18 @@ const Post: React.FC<PostProps> = ({ postId, author, content, topics, images, li
     fetchComments();
   }, [postId]);
 
+  const handleShowMoreComments = async () => {
+    if (!commentsCursor) return;
+    setLoadingMoreComments(true);
+    try {
+      await fetchCommentsPage(commentsCursor);
+    } catch (error) {
+      console.error("Failed to fetch comments:", error);
+    } finally {
+      setLoadingMoreComments(false);
+    }
+  };
+
   const handleAddComment = async () => {
     if (!newComment.trim()) return;
 
@@ -249,6 +273,16 @@ const Post: React.FC<PostProps> = ({ postId, author, content, topics, images, li
         ) : (
           <Text>No comments yet.</Text>
         )}
+        {commentsCursor && !loadingComments && (
+          <Button
+            size="sm"
+            variant="ghost"
+            onClick={handleShowMoreComments}
+            isLoading={loadingMoreComments}
+          >
+            Show more comments
+          </Button>
+        )}
       </VStack>
       
     </Box>
@@ -152,8 +152,9 @@ const Dashboard: React.FC = () => {
   useEffect(() => {
     const fetchUsers = async () => {
       try {
-        const data = await getAllUsers();
-        setUsers(data);
+        // Show each page of users as soon as it arrives
+        setUsers([]);
+        await getAllUsers((page) => setUsers((loaded) => [...loaded, ...page]));
       } catch (error) {
         console.error("Failed to fetch users:", error);
         toast({